@@ -0,0 +1,38 @@
+"""
+Typed failures raised by ICloudAdapter implementations.
+
+Adapters must raise these instead of printing and returning, so the policy layer
+can decide whether to retry and the deployment job can record why it failed.
+"""
+
+
+class AdapterError(Exception):
+    """Base class for every failure surfaced by an adapter operation."""
+
+    def __init__(
+        self, message: str, operation: str | None = None, node: str | None = None
+    ):
+        super().__init__(message)
+        self.operation = operation
+        self.node = node
+
+    def to_dict(self) -> dict:
+        """Serialisable form stored alongside the range state."""
+        return {
+            "type": type(self).__name__,
+            "message": str(self),
+            "operation": self.operation,
+            "node": self.node,
+        }
+
+
+class TransientAdapterError(AdapterError):
+    """The operation may succeed if retried (timeouts, 5xx, lost connections)."""
+
+
+class PermanentAdapterError(AdapterError):
+    """Retrying will not help (bad template, VMID clash, permission denied)."""
+
+
+class CircuitOpenError(AdapterError):
+    """The circuit breaker for the target node is open; the call was not attempted."""
@@ -0,0 +1,287 @@
+"""
+Concurrency governor shared by every adapter call path.
+
+Caps how hard the orchestrator leans on the hypervisor: concurrent full clones per
+node and per storage, adapter API calls per second, and concurrent network reloads
+(bridge create/delete both re-apply the host's network config). Callers beyond a
+limit queue, and queued work is handed out round-robin across ranges so one large
+deployment cannot starve the others.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from app.adapters.iadapter import ICloudAdapter
+
+# Range on whose behalf the current thread is calling the adapter (fairness key)
+current_range: ContextVar[str] = ContextVar("current_range", default="-")
+
+
+@dataclass(frozen=True)
+class GovernorLimits:
+    max_clones_per_node: int = 2
+    max_clones_per_storage: int = 2
+    max_api_rps: float = 20.0
+    max_network_reloads: int = 1
+
+    @classmethod
+    def from_env(cls) -> "GovernorLimits":
+        return cls(
+            max_clones_per_node=int(
+                os.getenv("GOV_MAX_CLONES_PER_NODE", cls.max_clones_per_node)
+            ),
+            max_clones_per_storage=int(
+                os.getenv("GOV_MAX_CLONES_PER_STORAGE", cls.max_clones_per_storage)
+            ),
+            max_api_rps=float(os.getenv("GOV_MAX_API_RPS", cls.max_api_rps)),
+            max_network_reloads=int(
+                os.getenv("GOV_MAX_NETWORK_RELOADS", cls.max_network_reloads)
+            ),
+        )
+
+
+class FairSemaphore:
+    """
+    Counting semaphore whose waiters are grouped by key (the range) and served
+    round-robin: each release hands the slot to the next range in turn rather
+    than to whichever thread queued first.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.in_use = 0
+        self.peak_queued = 0
+        self._cond = threading.Condition()
+        self._queues: dict[str, deque[object]] = {}
+        self._turns: deque[str] = deque()
+        self._granted: set[object] = set()
+
+    def _queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def acquire(self, key: str) -> None:
+        with self._cond:
+            if self.in_use < self.capacity and not self._turns:
+                self.in_use += 1
+                return
+
+            ticket = object()
+            if key not in self._queues:
+                self._queues[key] = deque()
+                self._turns.append(key)
+            self._queues[key].append(ticket)
+            self.peak_queued = max(self.peak_queued, self._queued())
+
+            while ticket not in self._granted:
+                self._cond.wait()
+            self._granted.discard(ticket)
+
+    def release(self) -> None:
+        with self._cond:
+            if not self._turns:
+                self.in_use -= 1
+                return
+
+            # Hand the slot straight to the next range's oldest waiter
+            key = self._turns.popleft()
+            queue = self._queues[key]
+            self._granted.add(queue.popleft())
+            if queue:
+                self._turns.append(key)
+            else:
+                del self._queues[key]
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, key: str) -> Iterator[None]:
+        self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_use": self.in_use,
+                "queued": self._queued(),
+                "queued_by_range": {k: len(q) for k, q in self._queues.items()},
+                "peak_queued": self.peak_queued,
+            }
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second with a burst of `rate`."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.throttled_seconds = 0.0
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(
+                        self.capacity, self._tokens + (now - self._last) * self.rate
+                    )
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+                    self.throttled_seconds += delay
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "queued": self.waiting,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+            }
+
+
+class Governor:
+    """Owns every limiter; one instance is shared by all adapters in the process."""
+
+    def __init__(self, limits: GovernorLimits | None = None):
+        self.limits = limits or GovernorLimits.from_env()
+        self.api = TokenBucket(self.limits.max_api_rps)
+        self._pools: dict[str, dict[str, FairSemaphore]] = {
+            "clones_per_node": {},
+            "clones_per_storage": {},
+            "network_reloads": {},
+        }
+        self._capacities = {
+            "clones_per_node": self.limits.max_clones_per_node,
+            "clones_per_storage": self.limits.max_clones_per_storage,
+            "network_reloads": self.limits.max_network_reloads,
+        }
+        self._lock = threading.Lock()
+
+    def _semaphore(self, pool: str, name: str) -> FairSemaphore:
+        with self._lock:
+            sems = self._pools[pool]
+            if name not in sems:
+                sems[name] = FairSemaphore(self._capacities[pool])
+            return sems[name]
+
+    @contextmanager
+    def clone_slot(self, node: str, storage: str) -> Iterator[None]:
+        # Always node before storage so concurrent clones cannot deadlock
+        key = current_range.get()
+        with ExitStack() as stack:
+            stack.enter_context(self._semaphore("clones_per_node", node).slot(key))
+            stack.enter_context(
+                self._semaphore("clones_per_storage", storage).slot(key)
+            )
+            yield
+
+    @contextmanager
+    def network_reload_slot(self, node: str) -> Iterator[None]:
+        with self._semaphore("network_reloads", node).slot(current_range.get()):
+            yield
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pools = {pool: dict(sems) for pool, sems in self._pools.items()}
+        result: dict[str, Any] = {"api_rate": self.api.snapshot()}
+        for pool, sems in pools.items():
+            result[pool] = {name: sem.snapshot() for name, sem in sems.items()}
+        return result
+
+
+class GovernedAdapter(ICloudAdapter):
+    """Decorates another adapter so every call passes through the governor."""
+
+    def __init__(self, inner: ICloudAdapter, governor: Governor):
+        self.inner = inner
+        self.governor = governor
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def get_node_name(self) -> str:
+        return self.inner.get_node_name()
+
+    def get_storage(self, template_id: int) -> str:
+        self.governor.api.acquire()
+        return self.inner.get_storage(template_id)
+
+    def get_cluster_status(self) -> list[Any]:
+        self.governor.api.acquire()
+        return self.inner.get_cluster_status()
+
+    def clone_node(self, template_id: int, newid: int, name: str):
+        node = self.get_node_name()
+        storage = self.get_storage(template_id)
+        with self.governor.clone_slot(node, storage):
+            self.governor.api.acquire()
+            return self.inner.clone_node(template_id, newid, name)
+
+    def delete_vm(self, vmid: int):
+        self.governor.api.acquire()
+        return self.inner.delete_vm(vmid)
+
+    def configure_network(self, vmid: int, bridges: list):
+        self.governor.api.acquire()
+        return self.inner.configure_network(vmid, bridges)
+
+    def start_vm(self, vmid: int):
+        self.governor.api.acquire()
+        return self.inner.start_vm(vmid)
+
+    def create_bridge(self, bridge_name: str, comment: str = "Auto-generated"):
+        with self.governor.network_reload_slot(self.get_node_name()):
+            self.governor.api.acquire()
+            return self.inner.create_bridge(bridge_name, comment)
+
+    def delete_bridge(self, bridge_name: str):
+        with self.governor.network_reload_slot(self.get_node_name()):
+            self.governor.api.acquire()
+            return self.inner.delete_bridge(bridge_name)
+
+    def list_bridges(self) -> list[str]:
+        self.governor.api.acquire()
+        return self.inner.list_bridges()
+
+    def list_vms(self) -> list[dict]:
+        self.governor.api.acquire()
+        return self.inner.list_vms()
+
+    def get_vm_status(self, vmid: int) -> dict:
+        self.governor.api.acquire()
+        return self.inner.get_vm_status(vmid)
+
+    def agent_ping(self, vmid: int) -> bool:
+        self.governor.api.acquire()
+        return self.inner.agent_ping(vmid)
+
+    def snapshot_vm(self, vmid: int, snapname: str):
+        self.governor.api.acquire()
+        return self.inner.snapshot_vm(vmid, snapname)
+
+    def rollback_vm(self, vmid: int, snapname: str):
+        self.governor.api.acquire()
+        return self.inner.rollback_vm(vmid, snapname)
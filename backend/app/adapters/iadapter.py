@@ -3,6 +3,9 @@ Abstract Base Class for cloud infrastructure providers.
 
 Any new provider (e.g., AzureAdapter) must implement these methods to ensure
 compatibility with the Engine.
+
+Failures must be raised as the typed errors in app.adapters.errors rather than
+swallowed, so the policy layer can retry them and the job can report them.
 """
 
 from abc import ABC, abstractmethod
@@ -18,14 +21,79 @@ class ICloudAdapter(ABC):
     def clone_node(self, template_id: int, newid: int, name: str):
         """
         NOTE: Implementations should ensure 'newid' is not already occupied
-        by the provider's API.
+        by the provider's API. Clones must be marked so list_vms() reports them
+        as "managed"; garbage collection never touches unmarked VMs.
         """
         pass
 
     @abstractmethod
     def delete_vm(self, vmid: int):
+        """Must be idempotent: deleting a VM that does not exist is not an error."""
+        pass
+
+    @abstractmethod
+    def configure_network(self, vmid: int, bridges: list):
+        pass
+
+    @abstractmethod
+    def start_vm(self, vmid: int):
+        pass
+
+    @abstractmethod
+    def create_bridge(self, bridge_name: str, comment: str = "Auto-generated"):
+        """Must be idempotent: creating an existing bridge is a no-op."""
         pass
 
     @abstractmethod
-    def configure_network(self, vmid: int, bridges: list[str]):
+    def delete_bridge(self, bridge_name: str):
+        """Must be idempotent: deleting a missing bridge is a no-op."""
+        pass
+
+    @abstractmethod
+    def list_bridges(self) -> list[str]:
+        """Returns the names of all bridges currently defined on the host."""
+        pass
+
+    @abstractmethod
+    def list_vms(self) -> list[dict]:
+        """
+        Every VM on the host in one call, as {"vmid": int, "status": str,
+        "managed": bool, ...}. "managed" is True only for VMs clone_node created.
+        Templates carry "template": 1 and VMs mid-task a "lock" key.
+        """
         pass
+
+    @abstractmethod
+    def get_vm_status(self, vmid: int) -> dict:
+        """
+        Current power state as {"status": "running" | "stopped", ...}. A "lock"
+        key is present while the hypervisor is still working on the VM.
+        """
+        pass
+
+    @abstractmethod
+    def agent_ping(self, vmid: int) -> bool:
+        """True once the guest agent inside the VM answers."""
+        pass
+
+    @abstractmethod
+    def snapshot_vm(self, vmid: int, snapname: str):
+        """Must be idempotent: an existing snapshot of that name counts as done."""
+        pass
+
+    @abstractmethod
+    def rollback_vm(self, vmid: int, snapname: str):
+        """Restores the VM's disks to the snapshot; the VM is left stopped."""
+        pass
+
+    def get_node_name(self) -> str:
+        """Hypervisor node that operations are sent to (used to key breakers)."""
+        return "default"
+
+    def get_storage(self, template_id: int) -> str:
+        """Storage a full clone of `template_id` lands on (used to key limits)."""
+        return "default"
+
+    def close(self) -> None:
+        """Releases connections held by the adapter (called on shutdown)."""
+        return None
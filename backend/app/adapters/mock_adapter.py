@@ -6,6 +6,7 @@ import random
 import time
 from typing import Any
 
+from app.adapters.errors import PermanentAdapterError
 from app.adapters.iadapter import ICloudAdapter
 
 
@@ -13,19 +14,63 @@ class MockAdapter(ICloudAdapter):
     def __init__(self):
         print("Initialised MockAdapter")
         self.deployed_vms: list[int] = []
+        # VMs that exist on the "host" but were not created through clone_node
+        self.foreign_vms: list[int] = []
+        self.bridges: set[str] = {"vmbr0"}
+        self.snapshots: dict[int, set[str]] = {}
+        # vmid -> time it finishes booting
+        self.booted_at: dict[int, float] = {}
 
-    def create_bridge(self, name: str, comment: str):
-        print(f"MOCK: Created bridge {name} ({comment})")
+    def get_node_name(self) -> str:
+        return "pve-mock-01"
 
-    def start_vm(self, vmid):
+    def get_storage(self, template_id: int) -> str:
+        return "local-lvm"
+
+    def create_bridge(self, bridge_name: str, comment: str = "Auto-generated"):
+        self.bridges.add(bridge_name)
+        print(f"MOCK: Created bridge {bridge_name} ({comment})")
+
+    def delete_bridge(self, bridge_name: str):
+        self.bridges.discard(bridge_name)
+        print(f"MOCK: Deleted bridge {bridge_name}")
+
+    def list_bridges(self) -> list[str]:
+        return sorted(self.bridges)
+
+    def list_vms(self) -> list[dict]:
+        return [
+            {
+                "vmid": vmid,
+                "managed": vmid in self.deployed_vms,
+                **self.get_vm_status(vmid),
+            }
+            for vmid in self.deployed_vms + self.foreign_vms
+        ]
+
+    def start_vm(self, vmid: int):
+        # Simulate boot time before the VM reports as running
+        self.booted_at.setdefault(vmid, time.monotonic() + random.uniform(0.1, 0.5))
         print(f"MOCK: Started VM {vmid}")
 
+    def get_vm_status(self, vmid: int) -> dict:
+        booted_at = self.booted_at.get(vmid)
+        running = booted_at is not None and time.monotonic() >= booted_at
+        return {"vmid": vmid, "status": "running" if running else "stopped"}
+
+    def agent_ping(self, vmid: int) -> bool:
+        return self.get_vm_status(vmid)["status"] == "running"
+
     def get_cluster_status(self) -> list[Any]:
-        """Simulates a healthy 3-node cluster"""
+        """Simulates a healthy 3-node cluster (memory in bytes, as Proxmox reports)"""
+        gib = 1024**3
         return [
-            {"node": "pve-mock-01", "status": "online", "cpu": 0.12, "mem": 4096},
-            {"node": "pve-mock-02", "status": "online", "cpu": 0.05, "mem": 8192},
-            {"node": "pve-mock-03", "status": "online", "cpu": 0.45, "mem": 2048},
+            {"node": "pve-mock-01", "status": "online", "cpu": 0.12, "maxcpu": 16,
+             "mem": 4 * gib, "maxmem": 64 * gib},
+            {"node": "pve-mock-02", "status": "online", "cpu": 0.05, "maxcpu": 16,
+             "mem": 8 * gib, "maxmem": 64 * gib},
+            {"node": "pve-mock-03", "status": "online", "cpu": 0.45, "maxcpu": 16,
+             "mem": 2 * gib, "maxmem": 64 * gib},
         ]
 
     def clone_node(self, template_id: int, newid: int, name: str) -> None:
@@ -44,13 +89,27 @@ class MockAdapter(ICloudAdapter):
         self.deployed_vms.append(newid)
         print(f"DEBUG: [Mock] VM '{name}' (ID: {newid}) is now READY.")
 
+    def snapshot_vm(self, vmid: int, snapname: str):
+        self.snapshots.setdefault(vmid, set()).add(snapname)
+        print(f"DEBUG: [Mock] VM {vmid} snapshot '{snapname}' taken.")
+
+    def rollback_vm(self, vmid: int, snapname: str):
+        if snapname not in self.snapshots.get(vmid, set()):
+            raise PermanentAdapterError(f"snapshot '{snapname}' does not exist")
+        # Rolling back a disk-only snapshot is near-instant compared to a clone
+        time.sleep(random.uniform(0.05, 0.2))
+        self.booted_at.pop(vmid, None)
+        print(f"DEBUG: [Mock] VM {vmid} rolled back to '{snapname}'.")
+
     def delete_vm(self, vmid: int):
         """Simulates destroying a VM"""
         if vmid in self.deployed_vms:
             self.deployed_vms.remove(vmid)
+        self.snapshots.pop(vmid, None)
+        self.booted_at.pop(vmid, None)
         print(f"DEBUG: [Mock] VM {vmid} DESTROYED.")
 
-    def configure_network(self, vmid: int, bridges: list[str]):
+    def configure_network(self, vmid: int, bridges: list):
         """Simulates attaching virtual cables to bridges"""
         for i, bridge in enumerate(bridges):
             print(f"DEBUG: [Mock] VM {vmid} -> net{i} connected to {bridge}")
@@ -1,17 +1,43 @@
 import os
+import re
+import threading
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any, cast
 
+import requests
 import urllib3
+from app.adapters.errors import (
+    AdapterError,
+    PermanentAdapterError,
+    TransientAdapterError,
+)
 from app.adapters.iadapter import ICloudAdapter
 from dotenv import load_dotenv
 from proxmoxer import ProxmoxAPI
+from proxmoxer.core import ResourceException
+from requests.adapters import HTTPAdapter
 
 # Silence the InsecureRequestWarning for a cleaner console
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 load_dotenv()
 
+# Proxmox reports most failures as HTTP 500, so these messages mark the ones
+# that retrying can never fix.
+PERMANENT_MARKERS = ("already exists", "does not exist", "permission", "not a template")
+
+DISK_BUSES = ("scsi", "virtio", "sata", "ide")
+
+# Proxmox tag put on every clone, marking it as created (and collectable) by us
+MANAGED_TAG = os.getenv("PVE_MANAGED_TAG", "cyber-range")
+
+
+def _split_tags(tags: Any) -> list[str]:
+    """Proxmox stores tags ";"-separated but also accepts commas and spaces."""
+    return [tag for tag in re.split(r"[;,\s]+", str(tags or "")) if tag]
+
 
 class ProxmoxAdapter(ICloudAdapter):
     def __init__(self):
@@ -23,73 +49,134 @@ class ProxmoxAdapter(ICloudAdapter):
         if not all([host, user, t_name, t_value]):
             raise ValueError("Missing Proxmox configuration in environment variables.")
 
-        self.api = ProxmoxAPI(
-            str(host),
-            user=str(user),
-            token_name=str(t_name),
-            token_value=str(t_value),
-            verify_ssl=False,
-        )
+        self._credentials = {
+            "user": str(user),
+            "token_name": str(t_name),
+            "token_value": str(t_value),
+        }
+        self.pool_connections = int(os.getenv("PVE_POOL_CONNECTIONS", "4"))
+        self.pool_maxsize = int(os.getenv("PVE_POOL_MAXSIZE", "10"))
+        self.timeout = int(os.getenv("PVE_TIMEOUT", "30"))
+        self.verify_ssl = os.getenv("PVE_VERIFY_SSL", "false").lower() == "true"
+
+        self._lock = threading.Lock()
+        self.api = self._make_client(str(host))
         self._cached_node: str | None = None
+        self._template_storage: dict[int, str] = {}
+
+    def _make_client(self, host: str) -> ProxmoxAPI:
+        """Builds a client whose session keeps a sized, blocking keep-alive pool."""
+        client = ProxmoxAPI(
+            host,
+            verify_ssl=self.verify_ssl,
+            timeout=self.timeout,
+            **self._credentials,
+        )
+        # pool_block caps open sockets at pool_maxsize; extra threads wait for a
+        # free connection instead of opening (and then discarding) new ones.
+        # Retries are left to the policy layer, not the transport.
+        pool = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True,
+            max_retries=0,
+        )
+        session = client._store["session"]
+        session.mount("https://", pool)
+        session.mount("http://", pool)
+        return client
+
+    def _node_api(self, node: str) -> Any:
+        return self.api.nodes(node)
+
+    def close(self) -> None:
+        self.api._store["session"].close()
 
     def _get_node(self) -> str:
-        if not self._cached_node:
-            nodes = self.api.nodes.get()
-            if not nodes or not isinstance(nodes, list):
-                raise Exception("No Proxmox nodes reachable.")
-            self._cached_node = str(nodes[0]["node"])
-        return self._cached_node
+        with self._lock:
+            if not self._cached_node:
+                with self._errors("get_node"):
+                    nodes = self.api.nodes.get()
+                if not nodes or not isinstance(nodes, list):
+                    raise TransientAdapterError(
+                        "No Proxmox nodes reachable.", operation="get_node"
+                    )
+                self._cached_node = str(nodes[0]["node"])
+            return self._cached_node
+
+    def get_node_name(self) -> str:
+        return self._get_node()
+
+    def get_storage(self, template_id: int) -> str:
+        """Reads the storage of the template's first disk (cached per template)."""
+        if template_id not in self._template_storage:
+            node = self._get_node()
+            with self._errors("get_storage", node):
+                config = self._node_api(node).qemu(template_id).config.get()
+            storage = "default"
+            for key in sorted(config):
+                value = str(config[key])
+                if key.rstrip("0123456789") in DISK_BUSES and "media=cdrom" not in value:
+                    storage = value.split(":", 1)[0]
+                    break
+            self._template_storage[template_id] = storage
+        return self._template_storage[template_id]
 
     # --- IMPLEMENTING ABSTRACT METHODS ---
 
     def get_cluster_status(self) -> list[Any]:
         """Implemented: Satisfies ICloudAdapter requirement."""
-        try:
+        with self._errors("get_cluster_status"):
             nodes = self.api.nodes.get()
-            return list(nodes) if isinstance(nodes, list) else []
-        except Exception as e:
-            print(f"Error fetching cluster status: {e}")
-            return []
+        return list(nodes) if isinstance(nodes, list) else []
 
     def clone_node(self, template_id: int, newid: int, name: str):
         """Implemented: Handles async cloning and task waiting."""
         node = self._get_node()
-        try:
+        with self._errors("clone_node", node):
             upid = (
-                self.api.nodes(node)
+                self._node_api(node)
                 .qemu(template_id)
                 .clone.post(newid=newid, name=name, full=1)
             )
 
-            if isinstance(upid, str):
-                print(f"Clone started (UPID: {upid}). Waiting...")
-                self._wait_for_task(upid)
-            else:
-                raise Exception(f"Unexpected response from Proxmox clone: {upid}")
-        except Exception as e:
-            print(f"FAILED TO CLONE: {e}")
+            if not isinstance(upid, str):
+                raise PermanentAdapterError(
+                    f"Unexpected response from Proxmox clone: {upid}",
+                    operation="clone_node",
+                    node=node,
+                )
+            print(f"Clone started (UPID: {upid}). Waiting...")
+            self._wait_for_task(upid)
+            # Add our tag to any the template passed on rather than replacing them
+            config = self._node_api(node).qemu(newid).config
+            tags = _split_tags(config.get().get("tags"))
+            if MANAGED_TAG not in tags:
+                config.put(tags=";".join([*tags, MANAGED_TAG]))
 
     def delete_vm(self, vmid: int):
-        """Implemented: Stops VM safely before deletion."""
+        """Implemented: Stops VM safely before deletion. Missing VMs are ignored."""
         node = self._get_node()
         try:
-            # Stop task
-            stop_upid = self.api.nodes(node).qemu(vmid).status.stop.post()
-            if isinstance(stop_upid, str):
-                print(f"Stopping VM {vmid}...")
-                self._wait_for_task(stop_upid)
-
-            # Delete command
-            print(f"Deleting VM {vmid}...")
-            self.api.nodes(node).qemu(vmid).delete()
-        except Exception:
-            # Silently fail if VM is already gone or stop fails
-            pass
+            with self._errors("delete_vm", node):
+                # Stop task
+                stop_upid = self._node_api(node).qemu(vmid).status.stop.post()
+                if isinstance(stop_upid, str):
+                    print(f"Stopping VM {vmid}...")
+                    self._wait_for_task(stop_upid)
+
+                # Delete command
+                print(f"Deleting VM {vmid}...")
+                self._node_api(node).qemu(vmid).delete()
+        except PermanentAdapterError as e:
+            if "does not exist" not in str(e):
+                raise
+            print(f"VM {vmid} does not exist, skipping.")
 
     def configure_network(self, vmid: int, interfaces: list):
         node = self._get_node()
         config_payload = {}
-        
+
         for i, item in enumerate(interfaces):
             # IF item is a string ("vmbr100"), convert it to dictionary on the fly
             if isinstance(item, str):
@@ -103,58 +190,119 @@ class ProxmoxAdapter(ICloudAdapter):
             config_payload[f"net{i}"] = f"virtio,bridge={bridge_name}"
             config_payload[f"ipconfig{i}"] = f"ip={ip_config}"
 
-        try:
-            self.api.nodes(node).qemu(vmid).config.put(**config_payload)
-            print(f"Network configured for VM {vmid}")
-        except Exception as e:
-            print(f"PVE API Error: {e}")
+        with self._errors("configure_network", node):
+            self._node_api(node).qemu(vmid).config.put(**config_payload)
+        print(f"Network configured for VM {vmid}")
+
+    def list_bridges(self) -> list[str]:
+        node = self._get_node()
+        with self._errors("list_bridges", node):
+            networks = self._node_api(node).network.get()
+        return [n["iface"] for n in networks if n.get("type") == "bridge"]
+
+    def list_vms(self) -> list[dict]:
+        node = self._get_node()
+        with self._errors("list_vms", node):
+            vms = self._node_api(node).qemu.get()
+        return [
+            {
+                **vm,
+                "vmid": int(vm["vmid"]),
+                "managed": MANAGED_TAG in _split_tags(vm.get("tags")),
+            }
+            for vm in vms
+        ]
 
     def delete_bridge(self, bridge_name: str):
         node = self._get_node()
-        try:
-            # Fetch all networks to see if bridge_name exists
-            active_nets = [n['iface'] for n in self.api.nodes(node).network.get()]
-            
-            if bridge_name in active_nets:
-                self.api.nodes(node).network(bridge_name).delete()
-                # Apply changes
-                self.api.nodes(node).network.put() 
-                print(f"Bridge {bridge_name} removed.")
-            else:
-                print(f"Bridge {bridge_name} does not exist, skipping.")
-                
-        except Exception as e:
-            print(f"Error during bridge cleanup: {e}")
+        # Fetch all networks to see if bridge_name exists
+        if bridge_name not in self.list_bridges():
+            print(f"Bridge {bridge_name} does not exist, skipping.")
+            return
+
+        with self._errors("delete_bridge", node):
+            self._node_api(node).network(bridge_name).delete()
+            # Apply changes
+            self._node_api(node).network.put()
+        print(f"Bridge {bridge_name} removed.")
 
     def create_bridge(self, bridge_name: str, comment: str = "Auto-generated"):
         """Dynamically creates a Linux Bridge (Virtual Switch) on the Proxmox host."""
         node = self._get_node()
-        try:
-            # Check if bridge already exists
-            existing = self.api.nodes(node).network.get()
-            if any(iface['iface'] == bridge_name for iface in existing):
-                return
+        # Check if bridge already exists
+        if bridge_name in self.list_bridges():
+            return
 
-            print(f"Creating bridge {bridge_name}...")
-            self.api.nodes(node).network.post(
+        print(f"Creating bridge {bridge_name}...")
+        with self._errors("create_bridge", node):
+            self._node_api(node).network.post(
                 iface=bridge_name,
                 type="bridge",
                 autostart=1,
                 comments=comment
             )
             # Triggers the 'Apply Configuration' in Proxmox
-            self.api.nodes(node).network.put() 
-        except Exception as e:
-            print(f"Failed to create bridge: {e}")
+            self._node_api(node).network.put()
 
     def start_vm(self, vmid: int):
-        """Powers on the VM."""
+        """
+        Powers on the VM and waits for the start task to finish. A VM that is
+        already running is left alone, since Proxmox fails the task for it.
+        """
+        node = self._get_node()
+        with self._errors("start_vm", node):
+            vm = self._node_api(node).qemu(vmid)
+            if vm.status.current.get().get("status") == "running":
+                print(f"VM {vmid} already running.")
+                return
+            try:
+                upid = vm.status.start.post()
+                if isinstance(upid, str):
+                    self._wait_for_task(upid)
+            except (ResourceException, AdapterError) as e:
+                # Something else started it between the check and the start
+                if "already running" not in str(e):
+                    raise
+        print(f"VM {vmid} started.")
+
+    def get_vm_status(self, vmid: int) -> dict:
+        node = self._get_node()
+        with self._errors("get_vm_status", node):
+            return dict(self._node_api(node).qemu(vmid).status.current.get())
+
+    def agent_ping(self, vmid: int) -> bool:
+        node = self._get_node()
+        with self._errors("agent_ping", node):
+            try:
+                self._node_api(node).qemu(vmid).agent.ping.post()
+            except ResourceException:
+                # "QEMU guest agent is not running" until the guest has booted
+                return False
+        return True
+
+    def snapshot_vm(self, vmid: int, snapname: str):
+        """Takes a disk snapshot (no RAM state) that rollback_vm can restore."""
         node = self._get_node()
         try:
-            self.api.nodes(node).qemu(vmid).status.start.post()
-            print(f"VM {vmid} power on command sent.")
-        except Exception as e:
-            print(f"Error starting VM {vmid}: {e}")
+            with self._errors("snapshot_vm", node):
+                upid = self._node_api(node).qemu(vmid).snapshot.post(
+                    snapname=snapname, description="Baseline for fast reset"
+                )
+                if isinstance(upid, str):
+                    self._wait_for_task(upid)
+        except PermanentAdapterError as e:
+            # A retry after a lost response finds the snapshot already there
+            if "already" not in str(e):
+                raise
+        print(f"Snapshot '{snapname}' taken for VM {vmid}.")
+
+    def rollback_vm(self, vmid: int, snapname: str):
+        node = self._get_node()
+        with self._errors("rollback_vm", node):
+            upid = self._node_api(node).qemu(vmid).snapshot(snapname).rollback.post()
+            if isinstance(upid, str):
+                self._wait_for_task(upid)
+        print(f"VM {vmid} rolled back to '{snapname}'.")
 
     def destroy_range(self, vmids: list[int]):
         """Cleanup: Deletes all VMs in the provided list."""
@@ -163,17 +311,41 @@ class ProxmoxAdapter(ICloudAdapter):
 
     # --- HELPER METHODS ---
 
+    @contextmanager
+    def _errors(self, operation: str, node: str | None = None) -> Iterator[None]:
+        """Translates proxmoxer/requests exceptions into typed adapter errors."""
+        try:
+            yield
+        except AdapterError as e:
+            e.operation = e.operation or operation
+            e.node = e.node or node
+            raise
+        except ResourceException as e:
+            message = str(e)
+            status = int(e.status_code)
+            permanent = any(m in message.lower() for m in PERMANENT_MARKERS)
+            if permanent or (400 <= status < 500 and status not in (408, 429)):
+                raise PermanentAdapterError(message, operation, node) from e
+            raise TransientAdapterError(message, operation, node) from e
+        except (requests.ConnectionError, requests.Timeout, TimeoutError) as e:
+            raise TransientAdapterError(str(e), operation, node) from e
+        except Exception as e:
+            raise PermanentAdapterError(str(e), operation, node) from e
+
     def _wait_for_task(self, upid: str, timeout: int = 300):
         """Polls Proxmox task status until completion."""
         node = self._get_node()
         start = time.time()
         while time.time() - start < timeout:
-            status = cast(dict[str, Any], self.api.nodes(node).tasks(upid).status.get())
+            status = cast(dict[str, Any], self._node_api(node).tasks(upid).status.get())
 
             if status and status.get("status") == "stopped":
-                exitstatus = status.get("exitstatus")
+                exitstatus = str(status.get("exitstatus"))
                 if exitstatus == "OK":
                     return True
-                raise Exception(f"Task failed: {exitstatus}")
+                # Lock contention and timeouts inside the task clear up on their own
+                if "lock" in exitstatus or "timeout" in exitstatus:
+                    raise TransientAdapterError(f"Task failed: {exitstatus}", node=node)
+                raise PermanentAdapterError(f"Task failed: {exitstatus}", node=node)
             time.sleep(1)
-        raise TimeoutError(f"Task {upid} timed out.")
+        raise TransientAdapterError(f"Task {upid} timed out.", node=node)
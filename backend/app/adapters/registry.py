@@ -0,0 +1,84 @@
+"""
+Registry of adapter backends, imported lazily by name.
+
+Nothing here imports a backend module until an adapter is actually requested, so
+importing the API (e.g. in mock mode or in tests) never pulls in proxmoxer, and a
+slow or unreachable hypervisor cannot hold up process startup.
+"""
+
+import importlib
+import os
+import threading
+
+from app.adapters.governed_adapter import GovernedAdapter, Governor, current_range
+from app.adapters.iadapter import ICloudAdapter
+from app.adapters.resilient_adapter import ResilientAdapter
+from app.core.event_log import event_log
+
+# backend name -> "module:Class"
+ADAPTERS: dict[str, str] = {
+    "mock": "app.adapters.mock_adapter:MockAdapter",
+    "proxmox": "app.adapters.pve_adapter:ProxmoxAdapter",
+}
+
+
+def register_adapter(name: str, target: str) -> None:
+    """Registers a backend as "module:Class"; the module is imported on first use."""
+    ADAPTERS[name] = target
+
+
+def resolve_backend() -> str:
+    """ADAPTER_BACKEND wins; otherwise APP_MODE=PROD selects Proxmox."""
+    explicit = os.getenv("ADAPTER_BACKEND")
+    if explicit:
+        return explicit
+    return "proxmox" if os.getenv("APP_MODE") == "PROD" else "mock"
+
+
+def create_adapter(name: str) -> ICloudAdapter:
+    if name not in ADAPTERS:
+        raise ValueError(f"Unknown adapter backend '{name}'. Known: {sorted(ADAPTERS)}")
+    module_name, class_name = ADAPTERS[name].split(":")
+    adapter_cls = getattr(importlib.import_module(module_name), class_name)
+    return adapter_cls()
+
+
+def record_operation(summary: dict) -> None:
+    """Logs one adapter operation against the range it was made for."""
+    range_id = current_range.get()
+    event_log.record(
+        "adapter_operation", None if range_id == "-" else range_id, **summary
+    )
+
+
+class AdapterProvider:
+    """
+    Builds the process-wide adapter stack on first use and hands out the same
+    instance afterwards. The governor is created eagerly (it is cheap) so its
+    metrics are available before any adapter exists.
+    """
+
+    def __init__(self):
+        self.governor = Governor()
+        self._adapter: ICloudAdapter | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ICloudAdapter:
+        with self._lock:
+            if self._adapter is None:
+                inner = create_adapter(resolve_backend())
+                # Retries sit outside the governor so every attempt is rate limited
+                self._adapter = ResilientAdapter(
+                    GovernedAdapter(inner, self.governor),
+                    observer=record_operation,
+                )
+            return self._adapter
+
+    def close(self) -> None:
+        with self._lock:
+            if self._adapter is not None:
+                self._adapter.close()
+                self._adapter = None
+
+
+adapter_provider = AdapterProvider()
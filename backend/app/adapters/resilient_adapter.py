@@ -0,0 +1,258 @@
+"""
+Policy layer wrapping any ICloudAdapter with retries, backoff and circuit breakers.
+
+Transient failures (timeouts, 5xx, dropped connections) are retried with jittered
+exponential backoff so one flaky call does not sink a whole range deployment.
+Repeated transient failures against one hypervisor node open that node's breaker,
+failing fast instead of queueing more work onto an unhealthy host.
+"""
+
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from app.adapters.errors import (
+    AdapterError,
+    CircuitOpenError,
+    TransientAdapterError,
+)
+from app.adapters.iadapter import ICloudAdapter
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay: float = 0.5  # seconds
+    max_delay: float = 10.0  # seconds
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.getenv("ADAPTER_RETRY_ATTEMPTS", cls.max_attempts)),
+            base_delay=float(os.getenv("ADAPTER_RETRY_BASE_DELAY", cls.base_delay)),
+            max_delay=float(os.getenv("ADAPTER_RETRY_MAX_DELAY", cls.max_delay)),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker: closed -> open after `failure_threshold`
+    consecutive transient failures, half-open after `reset_timeout` seconds
+    (a single probe call is let through), closed again once a probe succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientAdapter(ICloudAdapter):
+    """
+    Decorates another adapter. Every operation is idempotent by contract except
+    clone_node, which is made safe to retry by deleting the half-built clone
+    before the next attempt.
+    """
+
+    def __init__(
+        self,
+        inner: ICloudAdapter,
+        policy: RetryPolicy | None = None,
+        failure_threshold: int | None = None,
+        reset_timeout: float | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        observer: Callable[[dict], None] | None = None,
+    ):
+        self.inner = inner
+        # Receives one summary per operation (timing, attempts, outcome)
+        self.observer = observer
+        self.policy = policy or RetryPolicy.from_env()
+        self.failure_threshold = failure_threshold or int(
+            os.getenv("ADAPTER_BREAKER_THRESHOLD", "5")
+        )
+        self.reset_timeout = reset_timeout or float(
+            os.getenv("ADAPTER_BREAKER_RESET", "30")
+        )
+        self._sleep = sleep
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker_for(self, node: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            if node not in self._breakers:
+                self._breakers[node] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[node]
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def get_node_name(self) -> str:
+        try:
+            return self.inner.get_node_name()
+        except AdapterError:
+            return "default"
+
+    def _call(
+        self,
+        operation: str,
+        fn: Callable[[], T],
+        compensate: Callable[[], None] | None = None,
+    ) -> T:
+        if self.observer is None:
+            return self._attempt(operation, fn, compensate, {})
+
+        summary: dict = {"operation": operation, "attempts": 0, "error": None}
+        started = time.monotonic()
+        try:
+            return self._attempt(operation, fn, compensate, summary)
+        except AdapterError as e:
+            summary["error"] = e.to_dict()
+            raise
+        finally:
+            summary["duration_seconds"] = round(time.monotonic() - started, 3)
+            self.observer(summary)
+
+    def _attempt(
+        self,
+        operation: str,
+        fn: Callable[[], T],
+        compensate: Callable[[], None] | None,
+        summary: dict,
+    ) -> T:
+        node = self.get_node_name()
+        summary["node"] = node
+        breaker = self.breaker_for(node)
+
+        for attempt in range(self.policy.max_attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(
+                    f"Circuit open for node {node}; refusing {operation}.",
+                    operation,
+                    node,
+                )
+            summary["attempts"] = attempt + 1
+            try:
+                result = fn()
+            except TransientAdapterError as e:
+                breaker.record_failure()
+                e.operation = e.operation or operation
+                e.node = e.node or node
+                if attempt + 1 >= self.policy.max_attempts:
+                    raise
+                print(f"RETRY: {operation} failed ({e}); attempt {attempt + 2}...")
+                if compensate:
+                    compensate()
+                self._sleep(self.policy.backoff(attempt))
+                continue
+            except AdapterError as e:
+                # The node answered, it just said no: that is not a health problem.
+                breaker.record_success()
+                e.operation = e.operation or operation
+                e.node = e.node or node
+                raise
+            breaker.record_success()
+            return result
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    # --- ICloudAdapter ---
+
+    def get_storage(self, template_id: int) -> str:
+        return self._call("get_storage", lambda: self.inner.get_storage(template_id))
+
+    def get_cluster_status(self) -> list[Any]:
+        return self._call("get_cluster_status", self.inner.get_cluster_status)
+
+    def clone_node(self, template_id: int, newid: int, name: str):
+        return self._call(
+            "clone_node",
+            lambda: self.inner.clone_node(template_id, newid, name),
+            compensate=lambda: self.inner.delete_vm(newid),
+        )
+
+    def delete_vm(self, vmid: int):
+        return self._call("delete_vm", lambda: self.inner.delete_vm(vmid))
+
+    def configure_network(self, vmid: int, bridges: list):
+        return self._call(
+            "configure_network", lambda: self.inner.configure_network(vmid, bridges)
+        )
+
+    def start_vm(self, vmid: int):
+        return self._call("start_vm", lambda: self.inner.start_vm(vmid))
+
+    def create_bridge(self, bridge_name: str, comment: str = "Auto-generated"):
+        return self._call(
+            "create_bridge", lambda: self.inner.create_bridge(bridge_name, comment)
+        )
+
+    def delete_bridge(self, bridge_name: str):
+        return self._call("delete_bridge", lambda: self.inner.delete_bridge(bridge_name))
+
+    def list_bridges(self) -> list[str]:
+        return self._call("list_bridges", self.inner.list_bridges)
+
+    def list_vms(self) -> list[dict]:
+        return self._call("list_vms", self.inner.list_vms)
+
+    def get_vm_status(self, vmid: int) -> dict:
+        return self._call("get_vm_status", lambda: self.inner.get_vm_status(vmid))
+
+    def agent_ping(self, vmid: int) -> bool:
+        return self._call("agent_ping", lambda: self.inner.agent_ping(vmid))
+
+    def snapshot_vm(self, vmid: int, snapname: str):
+        return self._call(
+            "snapshot_vm", lambda: self.inner.snapshot_vm(vmid, snapname)
+        )
+
+    def rollback_vm(self, vmid: int, snapname: str):
+        return self._call(
+            "rollback_vm", lambda: self.inner.rollback_vm(vmid, snapname)
+        )
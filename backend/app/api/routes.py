@@ -5,56 +5,302 @@ and includes the background task logic for syncing desired state with actual sta
 """
 
 import os
+import threading
 import time
-from uuid import UUID
-
-from app.adapters.mock_adapter import MockAdapter
-from app.adapters.pve_adapter import ProxmoxAdapter
+from dataclasses import asdict
+from typing import Annotated
+from uuid import UUID, uuid4
+
+from app.adapters.errors import AdapterError, TransientAdapterError
+from app.adapters.governed_adapter import current_range
+from app.adapters.iadapter import ICloudAdapter
+from app.adapters.registry import adapter_provider
+from app.core.admission import AdmissionDecision, Demand, admission
+from app.core.event_log import event_log
+from app.core.garbage_collector import (
+    GarbageCollectionError,
+    GarbageCollector,
+    OwnershipIndex,
+    lab_bridge_number,
+)
 from app.core.graph_engine import GraphEngine
+from app.core.lease_manager import (
+    Lease,
+    LeaseLostError,
+    RangeLeaseError,
+    range_leases,
+)
+from app.core.parallel import run_parallel
+from app.core.readiness import ReadinessChecker, ReadinessReport
 from app.core.state_manager import StateManager
-from app.models.schemas import CyberRangeRequest, DeploymentResponse
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from app.core.template_store import TemplateStore
+from app.models.schemas import (
+    CompactCyberRangeRequest,
+    CyberRangeRequest,
+    DeploymentResponse,
+    RangeTemplateRequest,
+    TemplateInstantiateRequest,
+    TemplateResponse,
+)
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 
+# Name of the disk snapshot every VM is reset to
+BASELINE_SNAPSHOT = "baseline"
+# Seconds between background garbage collections; 0 disables them
+GC_INTERVAL = float(os.getenv("GC_INTERVAL", "0"))
+# Minimum seconds between state checkpoints while VMs are being cloned. Every
+# checkpoint rewrites the whole range, so saving after each VM is quadratic.
+CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", "5"))
+
+# Leases on ranges parked in this worker's admission queue, so other workers
+# leave them alone until they are dispatched, or adopt them if this one dies
+_queued_leases: dict[str, Lease] = {}
+
 
 # --- Dependencies ---
-def get_adapter():
-    """Returns the appropriate adapter based on the environment."""
-    return ProxmoxAdapter() if os.getenv("APP_MODE") == "PROD" else MockAdapter()
+def get_adapter() -> ICloudAdapter:
+    """Returns the process-wide adapter, building it on first use."""
+    return adapter_provider.get()
 
 
-pve_adapter = get_adapter()
+AdapterDep = Annotated[ICloudAdapter, Depends(get_adapter)]
 
 
 # --- Background Task Logic ---
-async def run_deployment(request: CyberRangeRequest, engine: GraphEngine):
+# Plain `def` so Starlette runs each deployment in its threadpool; the governor
+# is what bounds how many of them hit the hypervisor at once.
+def run_deployment(
+    request: CyberRangeRequest, engine: GraphEngine, pve_adapter: ICloudAdapter
+):
     range_id = str(request.range_metadata.id).strip()
-    StateManager.save_range(request, status="provisioning") # Notify frontend we've started
-    
-    print(f"--- Syncing: {request.range_metadata.name} ({range_id}) ---")
+    current_range.set(range_id)
+    # Only the worker holding the range's lease may reconcile it
+    try:
+        with range_leases.hold(range_id) as lease:
+            _reconcile(request, engine, pve_adapter, lease)
+    except LeaseLostError as e:
+        # Another worker took the range over; its state wins
+        print(f"--- Abandoning {range_id}: {e} ---")
+        event_log.record("deploy_abandoned", range_id, reason=str(e))
+    except RangeLeaseError as e:
+        print(f"--- Skipping {range_id}: {e} ---")
+    finally:
+        # The range's VMs now exist (or never will); let queued requests in
+        admission.release(range_id)
+        _dispatch_queued(pve_adapter)
+
+
+def _spawn_deployment(
+    request: CyberRangeRequest, engine: GraphEngine, pve_adapter: ICloudAdapter
+):
+    """Runs a deployment on its own daemon thread."""
+    threading.Thread(
+        target=run_deployment, args=(request, engine, pve_adapter), daemon=True
+    ).start()
 
-    # 1. Topology Prep
-    request.nodes = engine.get_reachable_nodes()
+
+def _admit(
+    request: CyberRangeRequest, engine: GraphEngine, pve_adapter: ICloudAdapter
+) -> AdmissionDecision:
+    """Reserves capacity for the VMs this deployment will create (not reuse)."""
+    range_id = str(request.range_metadata.id).strip()
+    old_nodes_map = StateManager.map_nodes_by_id(StateManager.get_range(range_id))
+    new_nodes = [
+        n
+        for n in engine.get_reachable_nodes()
+        if not (old_nodes_map.get(str(n.id).strip()) or {}).get("vmid")
+    ]
+    return admission.admit(
+        range_id, Demand.of(new_nodes), pve_adapter, (request, engine, pve_adapter)
+    )
+
+
+def _start_admitted(
+    request: CyberRangeRequest,
+    engine: GraphEngine,
+    pve_adapter: ICloudAdapter,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """Runs admission and either schedules the deployment or parks it."""
+    try:
+        decision = _admit(request, engine, pve_adapter)
+    except AdapterError as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"reason": "Cluster status unavailable", "error": e.to_dict()},
+        ) from e
+
+    range_id = request.range_metadata.id
+    if decision.outcome == "rejected":
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "reason": f"Insufficient cluster capacity: {decision.reason}",
+                "demand": asdict(decision.demand),
+                "available": asdict(decision.available),
+            },
+        )
+    if decision.outcome == "queued":
+        _park(request, decision)
+        return {
+            "range_id": range_id,
+            "status": "queued",
+            "message": f"Queued until capacity frees up: {decision.reason}",
+        }
+
+    background_tasks.add_task(run_deployment, request, engine, pve_adapter)
+    return {
+        "range_id": range_id,
+        "status": "accepted",
+        "message": "Reconciliation task started.",
+    }
+
+
+def _park(request: CyberRangeRequest, decision: AdmissionDecision):
+    """Records a queued range and leases it for as long as this worker lives."""
+    range_id = str(request.range_metadata.id).strip()
+    # update_range keeps an existing range's VMIDs; new ranges need a full save
+    if not StateManager.update_range(range_id, status="queued"):
+        StateManager.save_range(request, status="queued")
+    event_log.record("deploy_queued", range_id, reason=decision.reason)
+
+    acquired_at = time.time()
+    if range_leases.acquire(range_id):
+        lease = Lease(range_leases, range_id, acquired_at)
+        lease.start()
+        _queued_leases[range_id] = lease
+
+
+def _requeue(request: CyberRangeRequest, pve_adapter: ICloudAdapter):
+    """Re-admits a range whose queueing worker died (e.g. was restarted)."""
+    range_id = str(request.range_metadata.id).strip()
+    engine = GraphEngine(request)
+    try:
+        decision = _admit(request, engine, pve_adapter)
+    except AdapterError as e:
+        print(f"Could not re-admit queued range {range_id}: {e}")
+        return
+    if decision.outcome == "admitted":
+        _spawn_deployment(request, engine, pve_adapter)
+    elif decision.outcome == "queued":
+        _park(request, decision)
+    else:
+        error = {"message": f"Insufficient cluster capacity: {decision.reason}"}
+        StateManager.update_range(range_id, status="failed", error=error)
+        event_log.record("deploy_failed", range_id, error=error)
+
+
+def _dispatch_queued(pve_adapter: ICloudAdapter):
+    """Starts every queued deployment that now fits, each on its own thread."""
+    try:
+        admitted = admission.drain(pve_adapter)
+    except AdapterError as e:
+        print(f"Could not drain admission queue: {e}")
+        return
+    for request, engine, adapter in admitted:
+        # run_deployment re-acquires the lease as the same owner
+        lease = _queued_leases.pop(str(request.range_metadata.id).strip(), None)
+        if lease:
+            lease.stop()
+        _spawn_deployment(request, engine, adapter)
+
+
+def _reconcile(
+    request: CyberRangeRequest,
+    engine: GraphEngine,
+    pve_adapter: ICloudAdapter,
+    lease: Lease,
+):
+    range_id = str(request.range_metadata.id).strip()
+    # Read the previous state first and carry its VMIDs over, so the
+    # checkpoints saved below never lose track of VMs that already exist
     old_state = StateManager.get_range(range_id)
     old_nodes_map = StateManager.map_nodes_by_id(old_state)
+    for node in request.nodes:
+        existing = old_nodes_map.get(str(node.id).strip())
+        if node.vmid is None and existing and isinstance(existing.get("vmid"), int):
+            node.vmid = existing["vmid"]
+    lease.check()
+    StateManager.save_range(request, status="provisioning") # Notify frontend we've started
 
-    # 2. Cleanup
-    _handle_deletions(request, old_nodes_map)
+    print(f"--- Syncing: {request.range_metadata.name} ({range_id}) ---")
+    started = time.time()
+    event_log.record("deploy_started", range_id, node_count=len(request.nodes))
 
-    # 3. Infrastructure Prep (Auto-create bridges defined in the graph)
-    # This assumes engine.get_required_bridges() returns a list of bridge names
-    for bridge_name in engine.get_required_bridges():
-        pve_adapter.create_bridge(bridge_name, f"Auto-gen for {range_id}")
+    # 1. Topology Prep
+    request.nodes = engine.get_reachable_nodes()
 
-    # 4. Provision & Power On
-    _handle_provisioning(request, engine, old_nodes_map)
+    try:
+        # 2. Cleanup
+        _delete_unconfirmed(range_id, old_state, request, pve_adapter, lease)
+        _handle_deletions(request, engine, old_nodes_map, pve_adapter, lease)
+
+        # 3. Infrastructure Prep (Auto-create bridges defined in the graph)
+        # This assumes engine.get_required_bridges() returns a list of bridge names
+        for bridge_name in engine.get_required_bridges():
+            lease.check()
+            pve_adapter.create_bridge(bridge_name, f"Auto-gen for {range_id}")
+
+        # 4. Provision & Power On
+        readiness = ReadinessChecker(pve_adapter)
+        started_at = _handle_provisioning(
+            request, engine, old_nodes_map, pve_adapter, readiness, lease
+        )
 
+        # 5. Only call the range running once every VM actually is
+        lease.check()
+        StateManager.save_range(request, status="booting")
+        report = readiness.wait_all(started_at, started_at)
+        _record_readiness(range_id, report)
+        lease.check()
+        StateManager.update_range(range_id, readiness=report.to_dict())
+        _raise_first(report.errors)
+    except AdapterError as e:
+        # Nodes provisioned so far keep their VMIDs, so redeploying resumes
+        # from here instead of rebuilding the whole range.
+        print(f"--- Reconciliation FAILED: {e} ---")
+        lease.check()
+        StateManager.save_range(request, status="failed", error=e.to_dict())
+        event_log.record(
+            "deploy_failed",
+            range_id,
+            duration_seconds=round(time.time() - started, 3),
+            error=e.to_dict(),
+        )
+        return
+
+    # 6. Baseline snapshot so the range can be reset without redeploying. The
+    # range is usable either way; storage without snapshot support only loses reset.
+    try:
+        _ensure_baseline(range_id, request, pve_adapter, lease)
+    except AdapterError as e:
+        print(f"--- Baseline snapshot FAILED, reset unavailable: {e} ---")
+        lease.check()
+        StateManager.update_range(range_id, baseline_error=e.to_dict())
+        event_log.record("baseline_failed", range_id, error=e.to_dict())
+
+    lease.check()
     StateManager.save_range(request, status="running")
+    event_log.record(
+        "deploy_completed",
+        range_id,
+        duration_seconds=round(time.time() - started, 3),
+        node_count=len(request.nodes),
+    )
     print("--- Reconciliation Complete: All Systems Go ---")
 
 
-def _handle_deletions(request: CyberRangeRequest, old_nodes_map: dict):
+def _handle_deletions(
+    request: CyberRangeRequest,
+    engine: GraphEngine,
+    old_nodes_map: dict,
+    pve_adapter: ICloudAdapter,
+    lease: Lease,
+):
     """Destroys VMs and Bridges that exist in state but not in the new request."""
     new_node_ids = {str(node.id).strip() for node in request.nodes}
     
@@ -63,28 +309,70 @@ def _handle_deletions(request: CyberRangeRequest, old_nodes_map: dict):
             vmid = old_node.get("vmid")
             if vmid:
                 print(f"REMOVING VM: {old_node.get('label')} (VMID: {vmid})")
+                lease.check()
                 pve_adapter.delete_vm(vmid)
 
-    engine = GraphEngine(request)
-    new_bridges = set(engine.get_required_bridges())
-    
-    all_pve_networks = pve_adapter.api.nodes(pve_adapter._get_node()).network.get()
-    
-    for net in all_pve_networks:
-        iface = net['iface']
-        # Only touch bridges we created (vmbr100 and above)
-        if iface.startswith("vmbr") and iface != "vmbr0":
-            try:
-                bridge_num = int(iface.replace("vmbr", ""))
-                if bridge_num >= 100 and iface not in new_bridges:
-                    print(f"REMOVING BRIDGE: {iface}")
-                    pve_adapter.delete_bridge(iface)
-            except ValueError:
-                continue # Skip non-numeric bridges
-
+    # Bridge names repeat across ranges, so keep any another range still uses
+    range_id = str(request.range_metadata.id).strip()
+    keep = set(engine.get_required_bridges())
+    keep |= OwnershipIndex.build(exclude=range_id).bridges
 
-def _handle_provisioning(request: CyberRangeRequest, engine: GraphEngine, old_nodes_map: dict):
+    for iface in pve_adapter.list_bridges():
+        # Only touch bridges we created (vmbr100 and above)
+        if lab_bridge_number(iface) is not None and iface not in keep:
+            print(f"REMOVING BRIDGE: {iface}")
+            lease.check()
+            pve_adapter.delete_bridge(iface)
+
+
+def _delete_unconfirmed(
+    range_id: str,
+    old_state: dict | None,
+    request: CyberRangeRequest,
+    pve_adapter: ICloudAdapter,
+    lease: Lease,
+):
+    """Removes half-built clones an earlier failed attempt may have left behind."""
+    unconfirmed = (old_state or {}).get("unconfirmed_vmids") or []
+    if not unconfirmed:
+        return
+    # Every range allocates from the same VMIDs, so another range may have
+    # cloned onto one of these since; that VM is theirs now
+    owned = {n.vmid for n in request.nodes}
+    owned |= OwnershipIndex.build(exclude=range_id).vmids
+    for vmid in unconfirmed:
+        if vmid not in owned:
+            print(f"REMOVING UNCONFIRMED CLONE: VMID {vmid}")
+            lease.check()
+            pve_adapter.delete_vm(vmid)
+    lease.check()
+    StateManager.update_range(range_id, unconfirmed_vmids=[])
+
+
+def _mark_unconfirmed(range_id: str, vmid: int) -> None:
+    state = StateManager.get_range(range_id) or {}
+    unconfirmed = set(state.get("unconfirmed_vmids") or []) | {vmid}
+    StateManager.update_range(range_id, unconfirmed_vmids=sorted(unconfirmed))
+
+
+def _handle_provisioning(
+    request: CyberRangeRequest,
+    engine: GraphEngine,
+    old_nodes_map: dict,
+    pve_adapter: ICloudAdapter,
+    readiness: ReadinessChecker,
+    lease: Lease,
+) -> dict[int, float]:
+    """
+    Clones missing VMs, (re)applies networking and powers everything on.
+    Returns when each VM was started (time.monotonic()), keyed by VMID.
+    """
+    range_id = str(request.range_metadata.id).strip()
+    started_at: dict[int, float] = {}
+    last_checkpoint = time.monotonic()
     used_vmids = {n["vmid"] for n in old_nodes_map.values() if isinstance(n.get("vmid"), int)}
+    # Never clone onto a VMID another range already owns
+    used_vmids |= OwnershipIndex.build(exclude=range_id).vmids
 
     for i, node in enumerate(request.nodes):
         node_id = str(node.id).strip()
@@ -100,29 +388,255 @@ def _handle_provisioning(request: CyberRangeRequest, engine: GraphEngine, old_no
             vmid = existing["vmid"]
             node.vmid = vmid
             print(f"UPDATING: {clean_label} (VMID: {vmid})")
+            lease.check()
             pve_adapter.configure_network(vmid, interfaces)
             pve_adapter.start_vm(vmid)
+            started_at[vmid] = time.monotonic()
             continue
 
         new_vmid = engine.generate_vmid(base=1000 + i, exclude=used_vmids)
         used_vmids.add(new_vmid)
-        node.vmid = new_vmid
 
         # Use the clean_label for both the log and the API call
         print(f"PROVISIONING: {clean_label} (VMID: {new_vmid})")
-        pve_adapter.clone_node(node.template_id, new_vmid, clean_label)
-        
-        time.sleep(2) 
-        
+        lease.check()
+        try:
+            pve_adapter.clone_node(node.template_id, new_vmid, clean_label)
+        except TransientAdapterError:
+            # A clone that timed out may still have left a half-built VM; track it
+            # for cleanup on the next attempt without claiming it for the node.
+            # Permanent failures (e.g. the VMID already exists) created nothing.
+            lease.check()
+            _mark_unconfirmed(range_id, new_vmid)
+            raise
+        # Only a finished clone belongs to the node
+        node.vmid = new_vmid
+
+        # The clone task is done, but the config may still be locked briefly
+        readiness.wait_unlocked(new_vmid)
+
+        lease.check()
         pve_adapter.configure_network(new_vmid, interfaces)
         pve_adapter.start_vm(new_vmid)
+        started_at[new_vmid] = time.monotonic()
+
+        # Checkpoint so a worker taking over after a crash knows this VM exists.
+        # Throttled; the caller saves the full state right after this returns.
+        if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+            lease.check()
+            StateManager.save_range(request, status="provisioning")
+            last_checkpoint = time.monotonic()
+
+    return started_at
+
+
+def _record_readiness(range_id: str, report: ReadinessReport) -> None:
+    for vmid, seconds in report.ready.items():
+        event_log.record("vm_ready", range_id, vmid=vmid, seconds=round(seconds, 3))
+    for vmid, error in report.errors.items():
+        print(f"VM {vmid} never became ready: {error}")
+        event_log.record("vm_not_ready", range_id, vmid=vmid, error=str(error))
+
+
+def _raise_first(errors: dict) -> None:
+    """Re-raises the first failure from a parallel fan-out, if any."""
+    for error in errors.values():
+        raise error
+
+
+def _ensure_baseline(
+    range_id: str,
+    request: CyberRangeRequest,
+    pve_adapter: ICloudAdapter,
+    lease: Lease,
+):
+    """Snapshots, in parallel, every VM not yet covered by the range's baseline."""
+    state = StateManager.get_range(range_id) or {}
+    baseline = state.get("baseline") or {"snapshot": BASELINE_SNAPSHOT, "vmids": []}
+    vmids = sorted(n.vmid for n in request.nodes if n.vmid is not None)
+    missing = [vmid for vmid in vmids if vmid not in baseline["vmids"]]
+
+    def snapshot(vmid: int):
+        lease.check()
+        pve_adapter.snapshot_vm(vmid, baseline["snapshot"])
+
+    _, errors = run_parallel(snapshot, missing)
+    _raise_first(errors)
+
+    # VMs removed from the topology drop out of the baseline with their disks
+    lease.check()
+    StateManager.update_range(
+        range_id,
+        baseline_error=None,
+        baseline={**baseline, "vmids": vmids, "updated_at": time.time()},
+    )
+
+
+def run_reset(range_id: str, pve_adapter: ICloudAdapter):
+    current_range.set(range_id)
+    try:
+        with range_leases.hold(range_id) as lease:
+            _reset(range_id, pve_adapter, lease)
+    except LeaseLostError as e:
+        print(f"--- Abandoning reset of {range_id}: {e} ---")
+    except RangeLeaseError as e:
+        print(f"--- Skipping reset of {range_id}: {e} ---")
+
+
+def _reset(range_id: str, pve_adapter: ICloudAdapter, lease: Lease):
+    """
+    Rolls every VM back to its baseline snapshot in parallel. Network config is
+    re-applied from the current topology, since the snapshot may predate a
+    redeploy that rewired the VM.
+    """
+    state = StateManager.get_range(range_id)
+    if not state or not state.get("baseline"):
+        return
+    request = StateManager.to_request(state)
+    engine = GraphEngine(request)
+    snapshot = state["baseline"]["snapshot"]
+    nodes = {
+        n.vmid: n for n in request.nodes if n.vmid in state["baseline"]["vmids"]
+    }
+
+    lease.check()
+    StateManager.update_range(range_id, status="resetting", error=None)
+    event_log.record("reset_started", range_id, vm_count=len(nodes))
+    print(f"--- Resetting {len(nodes)} VMs of {range_id} to '{snapshot}' ---")
+    started = time.time()
+
+    def restore(vmid: int) -> float:
+        lease.check()
+        pve_adapter.rollback_vm(vmid, snapshot)
+        pve_adapter.configure_network(
+            vmid, engine.get_node_interfaces(str(nodes[vmid].id))
+        )
+        pve_adapter.start_vm(vmid)
+        return time.monotonic()
+
+    started_at, errors = run_parallel(restore, nodes)
+    report = ReadinessChecker(pve_adapter).wait_all(started_at, started_at)
+    _record_readiness(range_id, report)
+    errors.update(report.errors)
+    last_reset = {
+        "started_at": started,
+        "duration_seconds": time.time() - started,
+        "readiness": report.to_dict(),
+    }
+    try:
+        _raise_first(errors)
+    except AdapterError as e:
+        print(f"--- Reset FAILED: {e} ---")
+        lease.check()
+        StateManager.update_range(
+            range_id, status="failed", error=e.to_dict(), last_reset=last_reset
+        )
+        event_log.record("reset_failed", range_id, error=e.to_dict(), **last_reset)
+        return
+
+    lease.check()
+    StateManager.update_range(range_id, status="running", last_reset=last_reset)
+    event_log.record("reset_completed", range_id, **last_reset)
+    print(f"--- Reset complete in {last_reset['duration_seconds']:.1f}s ---")
+
+
+def _teardown(range_id: str, pve_adapter: ICloudAdapter, lease: Lease) -> bool:
+    """Deletes the range's VMs, bridges and state; False if it is already gone."""
+    # Read under the lease, so VMs a just-finished reconcile added are included
+    range_state = StateManager.get_range(range_id)
+    if not range_state:
+        return False
+
+    # VMIDs and bridge names repeat across ranges; never touch another's
+    others = OwnershipIndex.build(exclude=range_id)
+
+    # Kill all VMs
+    for node in range_state["nodes"]:
+        if node.get("vmid"):
+            lease.check()
+            pve_adapter.delete_vm(node["vmid"])
+    # Another range may have cloned onto these VMIDs since
+    for vmid in range_state.get("unconfirmed_vmids") or []:
+        if vmid not in others.vmids:
+            lease.check()
+            pve_adapter.delete_vm(vmid)
+
+    # Kill all Bridges associated with this range that no other range uses
+    engine = GraphEngine(StateManager.to_request(range_state))
+    for bridge in engine.get_required_bridges():
+        if bridge not in others.bridges:
+            lease.check()
+            pve_adapter.delete_bridge(bridge)
+
+    # Remove from disk
+    lease.check()
+    StateManager.delete_range(range_id)
+    return True
+
+
+def resume_orphaned_ranges():
+    """
+    Re-runs reconciliation for ranges a dead worker left mid-deployment: they are
+    still "provisioning" (or "booting") but nobody holds a live lease on them.
+    Ranges a dead worker had queued go back through admission here.
+    """
+    for state in StateManager.get_all():
+        range_id = str(state["metadata"]["id"])
+        status = state.get("status")
+        if status not in ("provisioning", "booting", "queued"):
+            continue
+        if range_leases.holder(range_id) or admission.is_queued(range_id):
+            continue
+        request = StateManager.to_request(state)
+        if status == "queued":
+            print(f"TAKEOVER: re-queueing orphaned range {range_id}")
+            _requeue(request, get_adapter())
+            continue
+        print(f"TAKEOVER: resuming orphaned range {range_id}")
+        # Deployments take minutes; the scan must keep serving other ranges
+        _spawn_deployment(request, GraphEngine(request), get_adapter())
+
+
+def takeover_loop(stop: threading.Event):
+    """
+    Periodically adopts orphaned ranges until `stop` is set, applies event log
+    retention once a day, and collects orphaned VMs/bridges every GC_INTERVAL.
+    """
+    last_compaction = last_gc = time.time()
+    while not stop.wait(range_leases.ttl):
+        try:
+            resume_orphaned_ranges()
+            # Capacity can also free up outside this worker (other workers,
+            # manual cleanup), so queued requests are retried periodically
+            if admission.snapshot()["queued"]:
+                _dispatch_queued(get_adapter())
+        except Exception as e:
+            print(f"Maintenance scan failed: {e}")
+        # Each task is guarded on its own: one failing must not stop the others
+        # or end the thread
+        if time.time() - last_compaction > 86400:
+            last_compaction = time.time()
+            try:
+                event_log.compact()
+            except Exception as e:
+                print(f"Event log compaction failed: {e}")
+        if GC_INTERVAL and time.time() - last_gc > GC_INTERVAL:
+            last_gc = time.time()
+            try:
+                GarbageCollector(get_adapter()).collect()
+            except Exception as e:
+                print(f"Garbage collection skipped: {e}")
 
 
 # --- API Endpoints ---
 @router.post("/range", response_model=DeploymentResponse)
 async def create_cyber_range(
-    request: CyberRangeRequest, background_tasks: BackgroundTasks
+    request: CyberRangeRequest | CompactCyberRangeRequest,
+    background_tasks: BackgroundTasks,
+    pve_adapter: AdapterDep,
 ):
+    if isinstance(request, CompactCyberRangeRequest):
+        request = request.to_request()
     engine = GraphEngine(request)
 
     if not engine.validate_topology():
@@ -131,37 +645,243 @@ async def create_cyber_range(
             detail="Invalid topology: No Master Jumpbox found or graph is disconnected.",
         )
 
-    background_tasks.add_task(run_deployment, request, engine)
+    if admission.is_queued(str(request.range_metadata.id)):
+        raise HTTPException(
+            status_code=409, detail="Range is already queued for deployment."
+        )
+    owner = range_leases.holder(request.range_metadata.id)
+    if owner:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Range is currently being reconciled by worker {owner}.",
+        )
+
+    # Admission may have to refresh the cluster view; keep that off the event loop
+    return await run_in_threadpool(
+        _start_admitted, request, engine, pve_adapter, background_tasks
+    )
+
+
+@router.post("/range/{range_id}/reset", response_model=DeploymentResponse)
+async def reset_cyber_range(
+    range_id: UUID,
+    background_tasks: BackgroundTasks,
+    pve_adapter: AdapterDep,
+):
+    range_state = StateManager.get_range(range_id)
+    if not range_state:
+        raise HTTPException(status_code=404, detail="Range not found")
+    if not range_state.get("baseline"):
+        raise HTTPException(
+            status_code=409,
+            detail="Range has no baseline snapshot yet; wait for its first deployment.",
+        )
+
+    owner = range_leases.holder(range_id)
+    if owner:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Range is currently being reconciled by worker {owner}.",
+        )
+
+    background_tasks.add_task(run_reset, str(range_id), pve_adapter)
 
     return {
-        "range_id": request.range_metadata.id,
+        "range_id": range_id,
         "status": "accepted",
-        "message": "Reconciliation task started.",
+        "message": "Reset to baseline started.",
     }
 
 
+@router.post("/templates", response_model=TemplateResponse)
+async def create_range_template(template: RangeTemplateRequest):
+    """Validates a topology once and stores it, with its plan, as a new version."""
+    engine = GraphEngine(
+        CyberRangeRequest(
+            range_metadata={"id": uuid4(), "name": template.name},
+            nodes=template.nodes,
+            links=template.links,
+        )
+    )
+    if not engine.validate_topology():
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid topology: No Master Jumpbox found or graph is disconnected.",
+        )
+
+    entry = TemplateStore.save_template(template, engine)
+    return {
+        "name": template.name,
+        "version": entry["version"],
+        "node_count": len(entry["nodes"]),
+    }
+
+
+@router.get("/templates")
+async def list_range_templates():
+    return TemplateStore.list_templates()
+
+
+@router.post("/templates/{name}/instantiate", response_model=DeploymentResponse)
+async def instantiate_range_template(
+    name: str,
+    body: TemplateInstantiateRequest,
+    background_tasks: BackgroundTasks,
+    pve_adapter: AdapterDep,
+):
+    entry = TemplateStore.get_template(name, body.version)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    unknown = set(body.node_overrides) - {str(n["id"]) for n in entry["nodes"]}
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Overrides for unknown nodes: {sorted(unknown)}"
+        )
+
+    nodes = []
+    for node in entry["nodes"]:
+        override = body.node_overrides.get(str(node["id"]))
+        if override:
+            node = {**node, **override.model_dump(exclude_none=True)}
+        nodes.append(node)
+
+    # Only the IDs are fresh; the topology, and therefore the plan, is unchanged
+    request = CyberRangeRequest(
+        range_metadata={
+            "id": uuid4(),
+            "name": body.range_name,
+            "created_by": body.created_by,
+        },
+        nodes=nodes,
+        links=entry["links"],
+    )
+    engine = GraphEngine.from_plan(request, entry["plan"])
+    print(f"Instantiating template {name} v{entry['version']}")
+    return await run_in_threadpool(
+        _start_admitted, request, engine, pve_adapter, background_tasks
+    )
+
+
 @router.get("/ranges")
 async def list_cyber_ranges():
     return StateManager.get_all()
 
 
+@router.get("/metrics/governor")
+async def governor_metrics():
+    """Queue depth and utilisation of every hypervisor limit."""
+    return adapter_provider.governor.metrics()
+
+
+@router.get("/metrics/admission")
+async def admission_metrics():
+    """Cached cluster capacity, per-range reservations and the admission queue."""
+    return admission.snapshot()
+
+
 @router.delete("/range/{range_id}")
-async def delete_cyber_range(range_id: UUID):
-    # Get the state so we know which VMs to kill
-    range_state = StateManager.get_range(str(range_id))
-    if not range_state:
+async def delete_cyber_range(range_id: UUID, pve_adapter: AdapterDep):
+    if not StateManager.get_range(str(range_id)):
         raise HTTPException(status_code=404, detail="Range not found")
 
-    # Kill all VMs
-    for node in range_state.nodes:
-        if node.vmid:
-            pve_adapter.delete_vm(node.vmid)
+    # A queued range must never be dispatched once it is gone
+    if admission.cancel(str(range_id)):
+        lease = _queued_leases.pop(str(range_id), None)
+        if lease:
+            lease.release()
 
-    # Kill all Bridges associated with this range
-    engine = GraphEngine(range_state)
-    for bridge in engine.get_required_bridges():
-        pve_adapter.delete_bridge(bridge)
+    owner = range_leases.holder(range_id)
+    if owner:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Range is currently being reconciled by worker {owner}.",
+        )
 
-    # Remove from disk
-    StateManager.delete_range(range_id)
+    try:
+        # Holding the lease keeps other workers from reconciling it meanwhile
+        with range_leases.hold(range_id) as lease:
+            deleted = _teardown(str(range_id), pve_adapter, lease)
+    except RangeLeaseError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except AdapterError as e:
+        raise HTTPException(status_code=502, detail=e.to_dict()) from e
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Range not found")
+
+    event_log.record("range_deleted", str(range_id))
     return {"range_id": range_id, "status": "deleted"}
+
+
+@router.get("/events/export")
+def export_events(
+    range_id: str | None = None, event: str | None = None, since: float | None = None
+):
+    """Streams the event history as JSON lines, optionally filtered."""
+    return StreamingResponse(
+        event_log.iter_lines(range_id=range_id, event=event, since=since),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/events/import")
+async def import_events(request: Request):
+    """
+    Appends JSON-lines events from the request body. The body is consumed as a
+    stream and written in batches, so arbitrarily large histories can be loaded.
+    """
+    imported = rejected = 0
+    batch: list[str] = []
+    pending = b""
+
+    def accept(line: bytes) -> None:
+        nonlocal imported, rejected
+        try:
+            parsed = event_log.parse_line(line.decode())
+        except UnicodeDecodeError:
+            parsed = None
+        if parsed is None:
+            rejected += 1
+        else:
+            batch.append(parsed)
+            imported += 1
+
+    async def flush() -> None:
+        nonlocal batch
+        if batch:
+            await run_in_threadpool(event_log.write_lines, batch)
+            batch = []
+
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                accept(line)
+        if len(batch) >= 1000:
+            await flush()
+
+    if pending.strip():
+        accept(pending)
+    await flush()
+    return {"imported": imported, "rejected": rejected}
+
+
+@router.post("/events/compact")
+def compact_events(retention_days: float | None = None):
+    """Drops events older than the retention window (EVENT_RETENTION_DAYS)."""
+    return event_log.compact(retention_days)
+
+
+@router.post("/gc")
+def collect_garbage(pve_adapter: AdapterDep, dry_run: bool = True):
+    """
+    Deletes VMs and bridges no range owns once past GC_GRACE_SECONDS. Only
+    reports what it would delete unless called with dry_run=false.
+    """
+    try:
+        return GarbageCollector(pve_adapter).collect(dry_run=dry_run).to_dict()
+    except GarbageCollectionError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except AdapterError as e:
+        raise HTTPException(status_code=502, detail=e.to_dict()) from e
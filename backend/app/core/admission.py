@@ -0,0 +1,243 @@
+"""
+Capacity admission control for deployments.
+
+Before a deployment starts, the cores and memory its new VMs will ask for are
+compared with a cached view of the cluster's free capacity minus what in-flight
+deployments have already reserved. Requests that do not fit are queued (or
+rejected) up front instead of failing minutes later as half-finished clones.
+
+Reservations are tracked per worker process; the cluster view each worker reads
+still reflects VMs the others have finished creating.
+"""
+
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any
+
+from app.adapters.errors import AdapterError
+from app.adapters.iadapter import ICloudAdapter
+from app.models.schemas import VMNode
+
+MB = 1024 * 1024
+
+
+@dataclass
+class Demand:
+    cores: int = 0
+    memory_mb: int = 0
+    largest_memory_mb: int = 0  # a single VM must fit on one host
+
+    @classmethod
+    def of(cls, nodes: list[VMNode]) -> "Demand":
+        memory = [n.resources.memory for n in nodes]
+        return cls(
+            cores=sum(n.resources.cores for n in nodes),
+            memory_mb=sum(memory),
+            largest_memory_mb=max(memory, default=0),
+        )
+
+
+@dataclass
+class Capacity:
+    cores: float = 0
+    memory_mb: float = 0
+    largest_host_memory_mb: float = 0
+    # Limits with nothing running, for telling "not now" from "never"
+    total_cores: float = 0
+    total_memory_mb: float = 0
+    largest_host_total_memory_mb: float = 0
+
+
+@dataclass
+class AdmissionDecision:
+    outcome: str  # "admitted", "queued" or "rejected"
+    reason: str
+    demand: Demand
+    available: Capacity
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        status_ttl: float | None = None,
+        memory_headroom: float | None = None,
+        cpu_overcommit: float | None = None,
+        queue_enabled: bool | None = None,
+    ):
+        self.status_ttl = status_ttl or float(os.getenv("ADMISSION_STATUS_TTL", "30"))
+        # Fraction of each host's memory never handed out
+        self.memory_headroom = (
+            memory_headroom
+            if memory_headroom is not None
+            else float(os.getenv("ADMISSION_MEMORY_HEADROOM", "0.1"))
+        )
+        self.cpu_overcommit = cpu_overcommit or float(
+            os.getenv("ADMISSION_CPU_OVERCOMMIT", "4.0")
+        )
+        self.queue_enabled = (
+            queue_enabled
+            if queue_enabled is not None
+            else os.getenv("ADMISSION_QUEUE", "true").lower() == "true"
+        )
+        self._capacity: Capacity | None = None
+        self._fetched_at = 0.0
+        self._reserved: dict[str, Demand] = {}
+        self._queue: list[tuple[str, Demand, Any]] = []
+        self._lock = threading.Lock()
+
+    # --- Cluster view ---
+
+    def _capacity_from_status(self, status: list[Any]) -> Capacity:
+        capacity = Capacity()
+        for host in status:
+            if host.get("status") != "online":
+                continue
+            max_mem = host.get("maxmem", 0) / MB * (1 - self.memory_headroom)
+            usable = max_mem - host.get("mem", 0) / MB
+            capacity.memory_mb += max(0.0, usable)
+            capacity.total_memory_mb += max_mem
+            capacity.largest_host_memory_mb = max(
+                capacity.largest_host_memory_mb, usable
+            )
+            capacity.largest_host_total_memory_mb = max(
+                capacity.largest_host_total_memory_mb, max_mem
+            )
+            # Load rather than allocation is all the status exposes for CPU
+            max_cores = host.get("maxcpu", 0) * self.cpu_overcommit
+            capacity.cores += max_cores * (1 - host.get("cpu", 0))
+            capacity.total_cores += max_cores
+        return capacity
+
+    def _cluster_capacity(self, adapter: ICloudAdapter) -> Capacity:
+        """Cached free capacity, refreshed once older than status_ttl."""
+        if self._capacity is None or time.time() - self._fetched_at > self.status_ttl:
+            try:
+                self._capacity = self._capacity_from_status(
+                    adapter.get_cluster_status()
+                )
+                self._fetched_at = time.time()
+            except AdapterError:
+                # A stale view beats none; without any view we cannot admit
+                if self._capacity is None:
+                    raise
+        return self._capacity
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def _available(self, capacity: Capacity) -> Capacity:
+        reserved_cores = sum(d.cores for d in self._reserved.values())
+        reserved_mem = sum(d.memory_mb for d in self._reserved.values())
+        return replace(
+            capacity,
+            cores=capacity.cores - reserved_cores,
+            memory_mb=capacity.memory_mb - reserved_mem,
+        )
+
+    @staticmethod
+    def _shortfall(demand: Demand, available: Capacity) -> str | None:
+        if demand.memory_mb > available.memory_mb:
+            return f"needs {demand.memory_mb} MB memory, {available.memory_mb:.0f} MB free"
+        if demand.cores > available.cores:
+            return f"needs {demand.cores} cores, {available.cores:.0f} available"
+        if demand.largest_memory_mb > available.largest_host_memory_mb:
+            return f"a {demand.largest_memory_mb} MB VM fits on no single host"
+        return None
+
+    @staticmethod
+    def _never_fits(demand: Demand, capacity: Capacity) -> str | None:
+        """Why `demand` could not be placed even on an otherwise idle cluster."""
+        if demand.memory_mb > capacity.total_memory_mb:
+            return (
+                f"needs {demand.memory_mb} MB memory, "
+                f"cluster has {capacity.total_memory_mb:.0f} MB"
+            )
+        if demand.cores > capacity.total_cores:
+            return f"needs {demand.cores} cores, cluster has {capacity.total_cores:.0f}"
+        if demand.largest_memory_mb > capacity.largest_host_total_memory_mb:
+            return (
+                f"a {demand.largest_memory_mb} MB VM is larger than any host "
+                f"({capacity.largest_host_total_memory_mb:.0f} MB)"
+            )
+        return None
+
+    # --- Admission ---
+
+    def admit(
+        self, range_id: str, demand: Demand, adapter: ICloudAdapter, payload: Any = None
+    ) -> AdmissionDecision:
+        """
+        Reserves `demand` for the range if it fits. Otherwise queues `payload`
+        (handed back by drain() once capacity frees up) or rejects outright.
+        """
+        with self._lock:
+            available = self._available(self._cluster_capacity(adapter))
+            shortfall = self._shortfall(demand, available)
+            if shortfall is None and not self._queue:
+                self._reserved[range_id] = demand
+                return AdmissionDecision("admitted", "fits", demand, available)
+
+            # Queueing these would block every later request behind them for good
+            impossible = self._never_fits(demand, available)
+            if impossible:
+                reason = f"larger than the whole cluster ({impossible})"
+                return AdmissionDecision("rejected", reason, demand, available)
+            if not self.queue_enabled:
+                return AdmissionDecision("rejected", str(shortfall), demand, available)
+
+            self._queue.append((range_id, demand, payload))
+            reason = shortfall or "earlier requests are still queued"
+            return AdmissionDecision("queued", reason, demand, available)
+
+    def release(self, range_id: str) -> None:
+        """Drops the range's reservation once its VMs exist (or failed to)."""
+        with self._lock:
+            self._reserved.pop(range_id, None)
+            # The finished VMs now show up in cluster usage instead
+            self._fetched_at = 0.0
+
+    def drain(self, adapter: ICloudAdapter) -> list[Any]:
+        """Admits queued requests, oldest first, while they fit."""
+        admitted = []
+        with self._lock:
+            if not self._queue:
+                return admitted
+            available = self._available(self._cluster_capacity(adapter))
+            while self._queue:
+                range_id, demand, payload = self._queue[0]
+                if self._shortfall(demand, available):
+                    break
+                self._queue.pop(0)
+                self._reserved[range_id] = demand
+                available.cores -= demand.cores
+                available.memory_mb -= demand.memory_mb
+                admitted.append(payload)
+        return admitted
+
+    def cancel(self, range_id: str) -> bool:
+        """Takes the range out of the queue; False if it was not queued."""
+        with self._lock:
+            before = len(self._queue)
+            self._queue = [entry for entry in self._queue if entry[0] != range_id]
+            return len(self._queue) < before
+
+    def is_queued(self, range_id: str) -> bool:
+        with self._lock:
+            return any(r == range_id for r, _, _ in self._queue)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": asdict(self._capacity) if self._capacity else None,
+                "capacity_age_seconds": round(time.time() - self._fetched_at, 1)
+                if self._fetched_at
+                else None,
+                "reserved": {r: asdict(d) for r, d in self._reserved.items()},
+                "queued": [{"range_id": r, **asdict(d)} for r, d, _ in self._queue],
+            }
+
+
+admission = AdmissionController()
@@ -0,0 +1,190 @@
+"""
+Append-only JSON-lines log of range lifecycle events and adapter operations.
+
+StateManager only keeps the current snapshot of each range; this log keeps the
+history (deploy durations, failures, per-operation timings) for capacity planning.
+Callers never touch the disk: events go onto an in-memory queue and a background
+writer appends them in batches, so recording is cheap on the live deployment path.
+Readers stream the file line by line and never load the whole history.
+"""
+
+import fcntl
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+EVENT_LOG_FILE = Path(os.getenv("EVENT_LOG_FILE", "range_events.jsonl"))
+EVENT_RETENTION_DAYS = float(os.getenv("EVENT_RETENTION_DAYS", "90"))
+
+REQUIRED_FIELDS = ("ts", "event")
+
+
+def _timestamp(entry: dict) -> float | None:
+    """The entry's numeric timestamp, or None if it has none."""
+    ts = entry.get("ts")
+    if isinstance(ts, bool) or not isinstance(ts, int | float):
+        return None
+    return ts
+
+
+def _decode(line: str) -> dict | None:
+    """The line's event, or None if it is malformed (e.g. truncated by a crash)."""
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+class EventLog:
+    def __init__(self, path: Path | None = None):
+        self.path = path or EVENT_LOG_FILE
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+
+    # --- Writing ---
+
+    def record(self, event: str, range_id: str | None = None, **data) -> None:
+        """Queues one event; returns immediately."""
+        entry = {"ts": round(time.time(), 3), "event": event}
+        if range_id is not None:
+            entry["range_id"] = str(range_id)
+        entry.update(data)
+        self._queue.put(json.dumps(entry, separators=(",", ":"), default=str))
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is already waiting into the same write
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write_lines(batch)
+            except OSError as e:
+                print(f"Event log write failed, {len(batch)} events lost: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Blocks until every queued event has been written."""
+        self._queue.join()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Appends already-serialised events under the cross-process lock."""
+        payload = "".join(f"{line}\n" for line in lines)
+        if not payload:
+            return
+        while True:
+            with open(self.path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    # compact() may have swapped the file while we waited for
+                    # the lock; writing to the old inode would lose the batch
+                    if os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino:
+                        continue
+                    f.write(payload)
+                    return
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # --- Reading ---
+
+    def iter_lines(
+        self,
+        range_id: str | None = None,
+        event: str | None = None,
+        since: float | None = None,
+    ) -> Iterator[str]:
+        """
+        Streams matching raw lines (newline included) in the order written.
+        Filtered reads skip malformed lines, as compact() does.
+        """
+        self.flush()
+        if not self.path.exists():
+            return
+        with open(self.path) as f:
+            for line in f:
+                if range_id is None and event is None and since is None:
+                    yield line
+                    continue
+                entry = _decode(line)
+                if entry is None:
+                    continue
+                if range_id is not None and entry.get("range_id") != range_id:
+                    continue
+                if event is not None and entry.get("event") != event:
+                    continue
+                if since is not None and (_timestamp(entry) or 0) < since:
+                    continue
+                yield line
+
+    def iter_events(self, **filters) -> Iterator[dict]:
+        for line in self.iter_lines(**filters):
+            entry = _decode(line)
+            if entry is not None:
+                yield entry
+
+    @staticmethod
+    def parse_line(line: str) -> str | None:
+        """Validates an imported line; returns it re-serialised, or None if bad."""
+        entry = _decode(line)
+        if entry is None or not all(k in entry for k in REQUIRED_FIELDS):
+            return None
+        if _timestamp(entry) is None:
+            return None
+        return json.dumps(entry, separators=(",", ":"))
+
+    # --- Retention ---
+
+    def compact(self, retention_days: float | None = None) -> dict:
+        """
+        Rewrites the log without events older than the retention window. Holds the
+        append lock throughout so no event written meanwhile is lost.
+        """
+        self.flush()
+        days = EVENT_RETENTION_DAYS if retention_days is None else retention_days
+        cutoff = time.time() - days * 86400
+        kept = dropped = 0
+        if not self.path.exists():
+            return {"kept": kept, "dropped": dropped}
+
+        temp_file = self.path.with_suffix(".tmp")
+        with open(self.path) as src:
+            fcntl.flock(src, fcntl.LOCK_EX)
+            try:
+                with open(temp_file, "w") as dst:
+                    for line in src:
+                        # Malformed lines (e.g. imported before validation) go too
+                        parsed = self.parse_line(line)
+                        ts = _timestamp(json.loads(parsed)) if parsed else None
+                        if ts is not None and ts >= cutoff:
+                            dst.write(line)
+                            kept += 1
+                        else:
+                            dropped += 1
+                temp_file.replace(self.path)
+            except BaseException:
+                temp_file.unlink(missing_ok=True)
+                raise
+            finally:
+                fcntl.flock(src, fcntl.LOCK_UN)
+        return {"kept": kept, "dropped": dropped}
+
+
+event_log = EventLog()
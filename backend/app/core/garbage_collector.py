@@ -0,0 +1,231 @@
+"""
+Garbage collection of VMs and bridges that no range owns any more.
+
+Failed deployments, crashed workers and manual edits can leave clones and lab
+bridges behind that no range's state points at. Only VMs the adapter reports as
+"managed" (marked by clone_node) are candidates. The collector indexes every VMID
+and bridge owned by any range, lists what actually exists in one call each, and
+deletes the difference. Orphans are only removed once they have stayed orphaned
+for a grace period across runs (first sightings are persisted), so a VM cloned
+moments before its range checkpointed it is never mistaken for garbage.
+"""
+
+import fcntl
+import json
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.adapters.errors import AdapterError
+from app.adapters.iadapter import ICloudAdapter
+from app.core.event_log import event_log
+from app.core.graph_engine import GraphEngine
+from app.core.parallel import run_parallel
+from app.core.state_manager import StateManager
+
+GC_STATE_FILE = Path(os.getenv("GC_STATE_FILE", "gc_state.json"))
+GC_LOCK_FILE = GC_STATE_FILE.with_suffix(".lock")
+GC_GRACE_SECONDS = float(os.getenv("GC_GRACE_SECONDS", "3600"))
+GC_BATCH_SIZE = int(os.getenv("GC_BATCH_SIZE", "8"))
+# Only VMIDs and bridges in the ranges deployments allocate from are candidates
+GC_MIN_VMID = int(os.getenv("GC_MIN_VMID", "1000"))
+MIN_LAB_BRIDGE = 100
+
+
+class GarbageCollectionError(Exception):
+    """A collection run could not safely start."""
+
+
+def lab_bridge_number(name: str) -> int | None:
+    """vmbr100 -> 100 for bridges deployments create, None for anything else."""
+    if not name.startswith("vmbr"):
+        return None
+    try:
+        number = int(name.removeprefix("vmbr"))
+    except ValueError:
+        return None
+    return number if number >= MIN_LAB_BRIDGE else None
+
+
+@dataclass
+class OwnershipIndex:
+    vmids: set[int] = field(default_factory=set)
+    bridges: set[str] = field(default_factory=set)
+
+    @classmethod
+    def build(cls, exclude: str | None = None) -> "OwnershipIndex":
+        """Everything owned by any range in state, except range `exclude`."""
+        try:
+            states = StateManager.get_all(strict=True)
+        except (json.JSONDecodeError, OSError) as e:
+            # An empty index would make every VM look orphaned
+            raise GarbageCollectionError(f"Range state is unreadable: {e}") from e
+
+        index = cls()
+        for state in states:
+            if str(state["metadata"]["id"]) == exclude:
+                continue
+            for node in state.get("nodes", []):
+                if isinstance(node.get("vmid"), int):
+                    index.vmids.add(node["vmid"])
+            request = StateManager.to_request(state)
+            index.bridges.update(GraphEngine(request).get_required_bridges())
+        return index
+
+
+@dataclass
+class GCReport:
+    dry_run: bool
+    owned: dict[str, int]
+    # Orphans past their grace period: deleted, or to be deleted on a real run
+    eligible: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    # Orphans still inside their grace period -> seconds left
+    pending: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, dict] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "owned": self.owned,
+            "eligible": self.eligible,
+            "deleted": self.deleted,
+            "pending": {k: round(v, 1) for k, v in self.pending.items()},
+            "errors": self.errors,
+        }
+
+
+class GarbageCollector:
+    def __init__(
+        self,
+        adapter: ICloudAdapter,
+        grace_seconds: float | None = None,
+        batch_size: int | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.adapter = adapter
+        self.grace_seconds = (
+            GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        )
+        self.batch_size = batch_size or GC_BATCH_SIZE
+        self._clock = clock
+
+    @staticmethod
+    @contextmanager
+    def _exclusive() -> Iterator[None]:
+        """One collection at a time across all worker processes."""
+        with open(GC_LOCK_FILE, "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError as e:
+                raise GarbageCollectionError(
+                    "Another garbage collection is running."
+                ) from e
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _load_sightings() -> dict[str, float]:
+        if not GC_STATE_FILE.exists():
+            return {}
+        try:
+            return json.loads(GC_STATE_FILE.read_text())
+        except (json.JSONDecodeError, OSError):
+            # Losing sightings only restarts grace periods, which is safe
+            return {}
+
+    @staticmethod
+    def _save_sightings(sightings: dict[str, float]) -> None:
+        temp_file = GC_STATE_FILE.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(sightings, indent=4))
+        temp_file.replace(GC_STATE_FILE)
+
+    def find_orphans(self) -> tuple[set[str], OwnershipIndex]:
+        """Keys ("vm:<vmid>" / "bridge:<name>") of resources no range owns."""
+        # List before indexing: a VM that gets checkpointed in between then
+        # shows up as owned rather than as an orphan
+        vms = self.adapter.list_vms()
+        bridges = self.adapter.list_bridges()
+        index = OwnershipIndex.build()
+
+        orphans = {
+            f"vm:{vm['vmid']}"
+            for vm in vms
+            # Only VMs our clones created; operators' own VMs are never garbage
+            if vm.get("managed")
+            and vm["vmid"] >= GC_MIN_VMID
+            and vm["vmid"] not in index.vmids
+            and not vm.get("template")
+            and "lock" not in vm  # mid-clone or mid-backup
+        }
+        orphans |= {
+            f"bridge:{name}"
+            for name in bridges
+            if lab_bridge_number(name) is not None and name not in index.bridges
+        }
+        return orphans, index
+
+    def _delete(self, key: str) -> None:
+        kind, name = key.split(":", 1)
+        if kind == "vm":
+            self.adapter.delete_vm(int(name))
+        else:
+            self.adapter.delete_bridge(name)
+
+    def collect(self, dry_run: bool = False) -> GCReport:
+        """
+        Deletes orphans past their grace period, VMs before the bridges they may
+        still be plugged into. A dry run reports the same plan but changes
+        nothing, not even the recorded sightings.
+        """
+        with self._exclusive():
+            orphans, index = self.find_orphans()
+            now = self._clock()
+            # Resources that are owned again (or gone) forget their sighting
+            previous = self._load_sightings()
+            sightings = {key: previous.get(key, now) for key in orphans}
+
+            report = GCReport(
+                dry_run=dry_run,
+                owned={"vms": len(index.vmids), "bridges": len(index.bridges)},
+            )
+            for key, first_seen in sorted(sightings.items()):
+                remaining = first_seen + self.grace_seconds - now
+                if remaining > 0:
+                    report.pending[key] = remaining
+                else:
+                    report.eligible.append(key)
+            if dry_run:
+                return report
+
+            self._save_sightings(sightings)
+            for kind in ("vm:", "bridge:"):
+                batch = [key for key in report.eligible if key.startswith(kind)]
+                deleted, errors = run_parallel(
+                    self._delete, batch, max_workers=self.batch_size
+                )
+                for key in deleted:
+                    report.deleted.append(key)
+                    sightings.pop(key)
+                    event_log.record("gc_deleted", None, resource=key)
+                for key, error in errors.items():
+                    report.errors[key] = (
+                        error.to_dict()
+                        if isinstance(error, AdapterError)
+                        else {"message": str(error)}
+                    )
+            self._save_sightings(sightings)
+
+        event_log.record(
+            "gc_completed",
+            None,
+            deleted=len(report.deleted),
+            pending=len(report.pending),
+            errors=len(report.errors),
+        )
+        return report
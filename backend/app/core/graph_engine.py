@@ -16,6 +16,7 @@ class GraphEngine:
     def __init__(self, request: CyberRangeRequest):
         self.request = request
         self.graph = nx.Graph()
+        self._plan: dict | None = None
         self._build_graph()
 
         # Pre-compute bridge mapping (vmbr100, vmbr101, etc.)
@@ -24,6 +25,31 @@ class GraphEngine:
             for i, (u, v) in enumerate(self.graph.edges())
         }
 
+    @classmethod
+    def from_plan(cls, request: CyberRangeRequest, plan: dict) -> "GraphEngine":
+        """
+        Rebuilds an engine from a plan produced by to_plan() without touching
+        NetworkX. Only valid while the request's nodes and links are unchanged.
+        """
+        engine = cls.__new__(cls)
+        engine.request = request
+        engine.graph = nx.Graph()
+        engine._plan = plan
+        engine.bridge_map = {(u, v): bridge for u, v, bridge in plan["bridges"]}
+        return engine
+
+    def to_plan(self) -> dict:
+        """Serialisable snapshot of every graph-derived answer deployment needs."""
+        return {
+            "valid": self.validate_topology(),
+            "reachable": [str(n.id) for n in self.get_reachable_nodes()],
+            "bridges": [[u, v, bridge] for (u, v), bridge in self.bridge_map.items()],
+            "interfaces": {
+                str(n.id): self.get_node_interfaces(str(n.id))
+                for n in self.request.nodes
+            },
+        }
+
     def _build_graph(self) -> None:
         for node in self.request.nodes:
             self.graph.add_node(str(node.id), label=node.label, role=node.role)
@@ -70,6 +96,9 @@ class GraphEngine:
         and is a valid tree (no cycles).
         """
 
+        if self._plan is not None:
+            return bool(self._plan["valid"])
+
         # Check for at least one Master Jumpbox
         has_master = any(n.role == "jumpbox_main" for n in self.request.nodes)
         if not has_master:
@@ -81,6 +110,9 @@ class GraphEngine:
         Determines which vmbr interfaces a node should be connected to based on its edges.
         Main jumpbox always gets vmbr0, and other nodes get vmbrX based on their connections.
         """
+        if self._plan is not None:
+            return list(self._plan["interfaces"].get(str(node_id), []))
+
         interfaces = []
         if node_id not in self.graph:
             return []
@@ -99,6 +131,10 @@ class GraphEngine:
         """
         Returns a list of nodes that are reachable from Master Jumpbox.
         """
+        if self._plan is not None:
+            reachable = set(self._plan["reachable"])
+            return [n for n in self.request.nodes if str(n.id) in reachable]
+
         master = next((n for n in self.request.nodes if n.role == "jumpbox_main"), None)
         if not master:
             return []
@@ -0,0 +1,190 @@
+"""
+Cross-process ownership leases for ranges, backed by a local SQLite file.
+
+Only the worker holding a range's lease may reconcile it. Holders renew the lease
+in the background while they work; if a worker dies its lease simply expires and
+any other worker may take the range over. SQLite's write lock makes acquisition
+atomic across processes without any external service.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from uuid import UUID, uuid4
+
+LEASE_DB = Path(os.getenv("LEASE_DB", "range_leases.db"))
+LEASE_TTL = float(os.getenv("LEASE_TTL", "30"))
+
+
+class RangeLeaseError(Exception):
+    """Raised when another live worker already owns the range."""
+
+
+class LeaseLostError(RangeLeaseError):
+    """Raised by Lease.check() once the lease has been lost mid-reconciliation."""
+
+
+class Lease:
+    """A held lease; renewed by a daemon thread until released."""
+
+    def __init__(self, manager: "LeaseManager", range_id: str, acquired_at: float):
+        self.manager = manager
+        self.range_id = range_id
+        self.lost = False
+        # Local view of when the lease runs out unless renewed before then
+        self.expires_at = acquired_at + manager.ttl
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._renew_loop, daemon=True)
+
+    def _renew_loop(self) -> None:
+        interval = self.manager.ttl / 3
+        while not self._stop.wait(interval):
+            attempted_at = time.time()
+            try:
+                renewed = self.manager.renew(self.range_id)
+            except Exception as e:
+                # e.g. "database is locked"; keep trying while the lease is live
+                if time.time() < self.expires_at:
+                    print(f"Lease renewal for {self.range_id} failed, retrying: {e}")
+                    interval = self.manager.ttl / 10
+                    continue
+                print(f"LEASE LOST: range {self.range_id} expired unrenewed ({e}).")
+                self.lost = True
+                return
+            if not renewed:
+                print(f"LEASE LOST: range {self.range_id} was taken over.")
+                self.lost = True
+                return
+            self.expires_at = attempted_at + self.manager.ttl
+            interval = self.manager.ttl / 3
+
+    def check(self) -> None:
+        """Call before every mutation: a lost lease means another worker owns it."""
+        if self.lost:
+            raise LeaseLostError(f"Lease on range {self.range_id} was lost.")
+        # A renewal stuck past expiry has not marked it lost yet, but another
+        # worker may already have taken the range
+        if time.time() >= self.expires_at:
+            raise LeaseLostError(f"Lease on range {self.range_id} expired.")
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops renewing but leaves the row, for a hand-over within this worker."""
+        self._stop.set()
+        self._thread.join()
+
+    def release(self) -> None:
+        self.stop()
+        if not self.lost:
+            self.manager.release(self.range_id)
+
+
+class LeaseManager:
+    """
+    One instance per worker process; `owner` identifies the process so a lease
+    it already holds can be re-acquired but never stolen while still fresh.
+    """
+
+    def __init__(self, db_path: Path | None = None, ttl: float | None = None):
+        self.db_path = db_path or LEASE_DB
+        self.ttl = ttl or LEASE_TTL
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        # The SQLite lease is per process; this keeps two threads of the same
+        # worker from reconciling one range at once.
+        self._held: set[str] = set()
+        self._held_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None so BEGIN IMMEDIATE below controls the transaction
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "range_id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        return conn
+
+    def acquire(self, range_id: UUID | str) -> bool:
+        """Takes the lease if it is free, expired, or already ours."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO leases (range_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(range_id) DO UPDATE SET "
+                "owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+                (str(range_id), self.owner, now + self.ttl, now),
+            )
+            row = conn.execute(
+                "SELECT owner FROM leases WHERE range_id = ?", (str(range_id),)
+            ).fetchone()
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return row is not None and row[0] == self.owner
+
+    def renew(self, range_id: UUID | str) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE range_id = ? AND owner = ?",
+                (time.time() + self.ttl, str(range_id), self.owner),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def release(self, range_id: UUID | str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "DELETE FROM leases WHERE range_id = ? AND owner = ?",
+                (str(range_id), self.owner),
+            )
+        finally:
+            conn.close()
+
+    def holder(self, range_id: UUID | str) -> str | None:
+        """Owner of a live (unexpired) lease on the range, if any."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT owner FROM leases WHERE range_id = ? AND expires_at >= ?",
+                (str(range_id), time.time()),
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    @contextmanager
+    def hold(self, range_id: UUID | str) -> Iterator[Lease]:
+        """Acquires and keeps renewing the lease for the duration of the block."""
+        key = str(range_id)
+        with self._held_lock:
+            if key in self._held:
+                raise RangeLeaseError(f"Range {key} is already being reconciled.")
+            self._held.add(key)
+        try:
+            acquired_at = time.time()
+            if not self.acquire(key):
+                raise RangeLeaseError(f"Range {key} is owned by {self.holder(key)}.")
+            lease = Lease(self, key, acquired_at)
+            lease.start()
+            try:
+                yield lease
+            finally:
+                lease.release()
+        finally:
+            with self._held_lock:
+                self._held.discard(key)
+
+
+range_leases = LeaseManager()
@@ -0,0 +1,42 @@
+"""
+Fan-out helper for running one adapter operation across many VMs at once.
+
+The governor still applies to every call, so this only removes the serial waiting
+between independent operations; it cannot overload the hypervisor.
+"""
+
+import contextvars
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_PARALLELISM = int(os.getenv("MAX_PARALLELISM", "8"))
+
+
+def run_parallel[T, R](
+    fn: Callable[[T], R], items: Iterable[T], max_workers: int | None = None
+) -> tuple[dict[T, R], dict[T, Exception]]:
+    """
+    Calls `fn(item)` for every item concurrently and waits for all of them.
+    Returns (results, errors) keyed by item; one failure never cancels the rest.
+    """
+    items = list(items)
+    results: dict[T, R] = {}
+    errors: dict[T, Exception] = {}
+    if not items:
+        return results, errors
+
+    workers = min(max_workers or MAX_PARALLELISM, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each task runs in a copy of the caller's context so per-range
+        # context (e.g. the governor's fairness key) follows it into the pool
+        futures = {
+            item: pool.submit(contextvars.copy_context().run, fn, item)
+            for item in items
+        }
+        for item, future in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                errors[item] = e
+    return results, errors
@@ -0,0 +1,119 @@
+"""
+Readiness checks for freshly started VMs.
+
+Instead of sleeping a fixed amount after each clone or start, callers poll the
+hypervisor for real signals: the VM lock clearing once a clone/config task is
+done, the VM reporting "running", and optionally its guest agent answering. All
+VMs of a range are waited on concurrently, each with its own deadline.
+"""
+
+import os
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from app.adapters.errors import AdapterError, TransientAdapterError
+from app.adapters.iadapter import ICloudAdapter
+from app.core.parallel import run_parallel
+
+
+@dataclass
+class ReadinessPolicy:
+    timeout: float = 300.0  # per VM, seconds
+    first_poll: float = 0.25
+    max_poll: float = 2.0  # polls back off from first_poll up to this
+    require_agent: bool = False
+
+    @classmethod
+    def from_env(cls) -> "ReadinessPolicy":
+        return cls(
+            timeout=float(os.getenv("READINESS_TIMEOUT", "300")),
+            max_poll=float(os.getenv("READINESS_POLL_INTERVAL", "2")),
+            require_agent=os.getenv("READINESS_REQUIRE_AGENT", "false").lower()
+            == "true",
+        )
+
+
+@dataclass
+class ReadinessReport:
+    # vmid -> seconds from start command to ready
+    ready: dict[int, float] = field(default_factory=dict)
+    errors: dict[int, Exception] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "ready": {str(vmid): round(s, 3) for vmid, s in self.ready.items()},
+            "not_ready": {
+                str(vmid): e.to_dict() if isinstance(e, AdapterError) else str(e)
+                for vmid, e in self.errors.items()
+            },
+        }
+
+
+class ReadinessChecker:
+    def __init__(
+        self,
+        adapter: ICloudAdapter,
+        policy: ReadinessPolicy | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.adapter = adapter
+        self.policy = policy or ReadinessPolicy.from_env()
+        self._sleep = sleep
+        self._clock = clock
+
+    def _poll(self, vmid: int, what: str, check: Callable[[], bool]) -> float:
+        """Polls `check` until it is true; returns seconds waited."""
+        started = self._clock()
+        delay = self.policy.first_poll
+        while not check():
+            waited = self._clock() - started
+            if waited >= self.policy.timeout:
+                raise TransientAdapterError(
+                    f"VM {vmid} not {what} after {waited:.0f}s",
+                    operation="wait_ready",
+                )
+            self._sleep(min(delay, self.policy.timeout - waited))
+            delay = min(delay * 2, self.policy.max_poll)
+        return self._clock() - started
+
+    def wait_unlocked(self, vmid: int) -> float:
+        """Waits until no clone/config task holds the VM's lock."""
+        return self._poll(
+            vmid, "unlocked", lambda: "lock" not in self.adapter.get_vm_status(vmid)
+        )
+
+    def wait_ready(self, vmid: int) -> float:
+        """Waits until the VM runs (and its guest agent answers, if required)."""
+        waited = self._poll(
+            vmid,
+            "running",
+            lambda: self.adapter.get_vm_status(vmid).get("status") == "running",
+        )
+        if self.policy.require_agent:
+            waited += self._poll(
+                vmid, "answering agent pings", lambda: self.adapter.agent_ping(vmid)
+            )
+        return waited
+
+    def wait_all(
+        self, vmids: Iterable[int], started_at: dict[int, float] | None = None
+    ) -> ReadinessReport:
+        """
+        Waits for every VM concurrently. Time-to-ready is measured from
+        `started_at[vmid]` (a time.monotonic() value) when given, so VMs started
+        early in a sequential rollout are not under-reported.
+        """
+        vmids = list(vmids)
+        started_at = started_at or {}
+        now = self._clock()
+
+        def wait(vmid: int) -> float:
+            self.wait_ready(vmid)
+            return self._clock() - started_at.get(vmid, now)
+
+        # Bounded by MAX_PARALLELISM: VMs beyond it wait for a free slot, and
+        # each VM's deadline only starts once its own wait does
+        results, errors = run_parallel(wait, vmids)
+        return ReadinessReport(ready=results, errors=errors)
@@ -4,13 +4,27 @@ NOTE: Only for demonstration. Needs to be unmodifiable except from this class to
 Otherwise, Zombie VMs may occur if the file is manually edited while the Engine is running.
 """
 
+import fcntl
 import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from uuid import UUID
 
-from app.models.schemas import CyberRangeRequest
+from app.models.schemas import (
+    CompactCyberRangeRequest,
+    CompactLinks,
+    CompactNodes,
+    CyberRangeRequest,
+)
 
 STATE_FILE = Path("active_ranges.json")
+# Serialises read-modify-write cycles across worker processes
+LOCK_FILE = STATE_FILE.with_suffix(".lock")
+# "compact" stores nodes/links as columns (see CompactCyberRangeRequest) in
+# unindented JSON; readers always get the full shape back either way
+STATE_FORMAT = os.getenv("STATE_FORMAT", "full")
 
 
 class StateManager:
@@ -19,52 +33,131 @@ class StateManager:
     """
 
     @staticmethod
-    def _load_all() -> dict:
+    def _load_all(strict: bool = False) -> dict:
+        """Unreadable state reads as empty unless `strict` is set."""
         if not STATE_FILE.exists():
             return {}
         try:
             return json.loads(STATE_FILE.read_text())
         except (json.JSONDecodeError, OSError):
+            if strict:
+                raise
             return {}
 
+    @staticmethod
+    @contextmanager
+    def _locked() -> Iterator[None]:
+        with open(LOCK_FILE, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
     @staticmethod
     def _write_all(data: dict) -> None:
         temp_file = STATE_FILE.with_suffix(".tmp")
         with open(temp_file, "w") as f:
-            json.dump(data, f, indent=4)
+            if STATE_FORMAT == "compact":
+                json.dump(data, f, separators=(",", ":"))
+            else:
+                json.dump(data, f, indent=4)
         temp_file.replace(STATE_FILE)
 
     @staticmethod
-    def get_range(range_id: UUID | str) -> dict | None:
-        return StateManager._load_all().get(str(range_id))
+    def _expand(entry: dict | None) -> dict | None:
+        """Returns a stored entry with compact node/link columns turned into rows."""
+        if not entry or entry.get("format") != "compact":
+            return entry
+        expanded = {k: v for k, v in entry.items() if k not in ("format", "layout")}
+        expanded["nodes"] = CompactNodes.model_validate(entry["nodes"]).rows(
+            entry.get("layout")
+        )
+        expanded["links"] = CompactLinks.model_validate(entry["links"]).rows()
+        return expanded
 
     @staticmethod
-    def save_range(request: CyberRangeRequest, status: str = "provisioning") -> None:
-        data = StateManager._load_all()
-        range_id = str(request.range_metadata.id)
-
-        data[range_id] = {
+    def _entry_for(request: CyberRangeRequest) -> dict:
+        if STATE_FORMAT == "compact":
+            compact = CompactCyberRangeRequest.from_request(request).dump()
+            return {
+                "format": "compact",
+                "metadata": compact["range_metadata"],
+                "nodes": compact["nodes"],
+                "links": compact["links"],
+                "layout": compact.get("layout"),
+            }
+        return {
             "metadata": request.range_metadata.model_dump(mode="json"),
             "nodes": [iter_node.model_dump(mode="json") for iter_node in request.nodes],
             "links": [iter_link.model_dump(mode="json") for iter_link in request.links],
+        }
+
+    @staticmethod
+    def get_range(range_id: UUID | str) -> dict | None:
+        return StateManager._expand(StateManager._load_all().get(str(range_id)))
+
+    @staticmethod
+    def save_range(
+        request: CyberRangeRequest,
+        status: str = "provisioning",
+        error: dict | None = None,
+    ) -> None:
+        range_id = str(request.range_metadata.id)
+        entry = {
+            **StateManager._entry_for(request),
             "status": status,
+            "error": error,
         }
-        StateManager._write_all(data)
+        with StateManager._locked():
+            data = StateManager._load_all()
+            # Keep fields owned by other workflows (e.g. the reset snapshot),
+            # but not the encoding markers of a previously compact entry
+            merged = {**data.get(range_id, {}), **entry}
+            if "format" not in entry:
+                merged.pop("format", None)
+                merged.pop("layout", None)
+            data[range_id] = merged
+            StateManager._write_all(data)
+
+    @staticmethod
+    def update_range(range_id: UUID | str, **fields) -> dict | None:
+        """Merges `fields` into a stored range; returns None if it does not exist."""
+        str_id = str(range_id)
+        with StateManager._locked():
+            data = StateManager._load_all()
+            if str_id not in data:
+                return None
+            data[str_id].update(fields)
+            StateManager._write_all(data)
+            return StateManager._expand(data[str_id])
 
     @staticmethod
-    def get_all() -> list:
-        return list(StateManager._load_all().values())
+    def get_all(strict: bool = False) -> list:
+        return [
+            StateManager._expand(e) for e in StateManager._load_all(strict).values()
+        ]
 
     @staticmethod
     def delete_range(range_id: UUID | str) -> bool:
-        data = StateManager._load_all()
         str_id = str(range_id)
-        if str_id in data:
-            del data[str_id]
-            StateManager._write_all(data)
-            return True
+        with StateManager._locked():
+            data = StateManager._load_all()
+            if str_id in data:
+                del data[str_id]
+                StateManager._write_all(data)
+                return True
         return False
 
+    @staticmethod
+    def to_request(state: dict) -> CyberRangeRequest:
+        """Rebuilds the request a stored range was deployed from."""
+        return CyberRangeRequest(
+            range_metadata=state["metadata"],
+            nodes=state.get("nodes", []),
+            links=state.get("links", []),
+        )
+
     @staticmethod
     def map_nodes_by_id(state: dict | None) -> dict:
         """Maps nodes for O(1) lookup during syncing."""
@@ -0,0 +1,92 @@
+"""
+Server-side library of named, versioned range templates.
+
+Each version is stored with the GraphEngine plan computed when it was saved, so
+instantiating a template only has to mint fresh IDs: validation, graph building
+and bridge planning have already been done once.
+"""
+
+import fcntl
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.core.graph_engine import GraphEngine
+from app.models.schemas import RangeTemplateRequest
+
+TEMPLATES_FILE = Path("range_templates.json")
+TEMPLATES_LOCK_FILE = TEMPLATES_FILE.with_suffix(".lock")
+
+
+class TemplateStore:
+    """
+    Versions are append-only: saving under an existing name adds version N+1
+    and leaves earlier versions untouched for ranges built from them.
+    """
+
+    @staticmethod
+    def _load_all() -> dict:
+        if not TEMPLATES_FILE.exists():
+            return {}
+        try:
+            return json.loads(TEMPLATES_FILE.read_text())
+        except (json.JSONDecodeError, OSError):
+            return {}
+
+    @staticmethod
+    @contextmanager
+    def _locked() -> Iterator[None]:
+        with open(TEMPLATES_LOCK_FILE, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_all(data: dict) -> None:
+        temp_file = TEMPLATES_FILE.with_suffix(".tmp")
+        with open(temp_file, "w") as f:
+            json.dump(data, f)
+        temp_file.replace(TEMPLATES_FILE)
+
+    @staticmethod
+    def save_template(template: RangeTemplateRequest, engine: GraphEngine) -> dict:
+        """Stores a new version with the engine's precomputed plan."""
+        entry = {
+            "description": template.description,
+            "created_at": time.time(),
+            "nodes": [n.model_dump(mode="json", exclude={"vmid"}) for n in template.nodes],
+            "links": [link.model_dump(mode="json") for link in template.links],
+            "plan": engine.to_plan(),
+        }
+        with TemplateStore._locked():
+            data = TemplateStore._load_all()
+            versions = data.setdefault(template.name, [])
+            entry["version"] = len(versions) + 1
+            versions.append(entry)
+            TemplateStore._write_all(data)
+        return entry
+
+    @staticmethod
+    def get_template(name: str, version: int | None = None) -> dict | None:
+        versions = TemplateStore._load_all().get(name, [])
+        if not versions:
+            return None
+        if version is None:
+            return versions[-1]
+        return next((v for v in versions if v["version"] == version), None)
+
+    @staticmethod
+    def list_templates() -> list[dict]:
+        return [
+            {
+                "name": name,
+                "latest_version": versions[-1]["version"],
+                "description": versions[-1]["description"],
+                "node_count": len(versions[-1]["nodes"]),
+            }
+            for name, versions in TemplateStore._load_all().items()
+        ]
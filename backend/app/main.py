@@ -1,11 +1,35 @@
-from app.api.routes import router
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+# Most settings are read from the environment when their module is imported,
+# so .env has to be loaded before anything from app is
+load_dotenv()
+
+from app.adapters.registry import adapter_provider, resolve_backend  # noqa: E402
+from app.api.routes import router, takeover_loop  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # The adapter is built lazily on the first request that needs it, so startup
+    # never waits on the hypervisor; shutdown releases its pooled connections.
+    stop = threading.Event()
+    threading.Thread(target=takeover_loop, args=(stop,), daemon=True).start()
+    yield
+    stop.set()
+    adapter_provider.close()
+
 
 app = FastAPI(
     title="Cyber Range Orchestrator",
     description="Software-Defined Cyber Range Infrastructure Manager",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -26,4 +50,4 @@ app.include_router(router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
-    return {"message": "Cyber Range API is Online", "mode": "Mock" if True else "Prod"}
+    return {"message": "Cyber Range API is Online", "backend": resolve_backend()}
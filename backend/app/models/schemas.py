@@ -2,10 +2,14 @@
 Schemas defining the structure of the request body for cyber range deployment
 """
 
-from typing import Literal
+from typing import Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+Role = Literal["jumpbox_main", "jumpbox_local", "service"]
+ConnectionType = Literal["vlan_bridge", "direct_link"]
+DEFAULT_POSITION = {"x": 0, "y": 0}
 
 
 # --- Metadata for whole range ---
@@ -25,11 +29,11 @@ class VMNode(BaseModel):
     id: str
     label: str
     template_id: int
-    role: Literal["jumpbox_main", "jumpbox_local", "service"]
+    role: Role
     resources: VMResource = Field(default_factory=VMResource)
 
     # Store position for frontend graph layout (optional, can be ignored by backend)
-    position: dict = {"x": 0, "y": 0}
+    position: dict = DEFAULT_POSITION
 
     vmid: int | None = None
 
@@ -39,7 +43,7 @@ class VMLink(BaseModel):
     id: str | None = None
     source: str
     target: str
-    connection_type: Literal["vlan_bridge", "direct_link"] = "vlan_bridge"
+    connection_type: ConnectionType = "vlan_bridge"
 
 
 # --- Root Object (Request Body) ---
@@ -49,7 +53,178 @@ class CyberRangeRequest(BaseModel):
     links: list[VMLink]
 
 
+# --- Compact (columnar) encoding for large ranges ---
+class _Columns(BaseModel):
+    """Column-per-field table: entry i of every column describes row i."""
+
+    @model_validator(mode="after")
+    def _check_lengths(self):
+        rows = len(next(iter(self.__dict__.values())))
+        for name, column in self.__dict__.items():
+            if column is not None and len(column) != rows:
+                raise ValueError(
+                    f"Column '{name}' has {len(column)} entries, expected {rows}"
+                )
+        return self
+
+
+def _column_or_none(values: list, default: Any) -> list | None:
+    """Optional columns are omitted when every row holds the default."""
+    return values if any(v != default for v in values) else None
+
+
+class CompactNodes(_Columns):
+    id: list[str]
+    label: list[str]
+    template_id: list[int]
+    role: list[Role]
+    cores: list[int] | None = None
+    memory: list[int] | None = None
+    vmid: list[int | None] | None = None
+
+    @classmethod
+    def from_nodes(cls, nodes: list[VMNode]) -> "CompactNodes":
+        defaults = VMResource()
+        return cls.model_construct(
+            id=[n.id for n in nodes],
+            label=[n.label for n in nodes],
+            template_id=[n.template_id for n in nodes],
+            role=[n.role for n in nodes],
+            cores=_column_or_none([n.resources.cores for n in nodes], defaults.cores),
+            memory=_column_or_none(
+                [n.resources.memory for n in nodes], defaults.memory
+            ),
+            vmid=_column_or_none([n.vmid for n in nodes], None),
+        )
+
+    def rows(self, layout: dict[str, dict] | None = None) -> list[dict]:
+        """The nodes as plain dicts, shaped like VMNode.model_dump()."""
+        count = len(self.id)
+        defaults = VMResource()
+        cores = self.cores or [defaults.cores] * count
+        memory = self.memory or [defaults.memory] * count
+        vmid = self.vmid or [None] * count
+        layout = layout or {}
+        return [
+            {
+                "id": self.id[i],
+                "label": self.label[i],
+                "template_id": self.template_id[i],
+                "role": self.role[i],
+                "resources": {"cores": cores[i], "memory": memory[i]},
+                "position": dict(layout.get(self.id[i], DEFAULT_POSITION)),
+                "vmid": vmid[i],
+            }
+            for i in range(count)
+        ]
+
+
+class CompactLinks(_Columns):
+    source: list[str]
+    target: list[str]
+    id: list[str | None] | None = None
+    connection_type: list[ConnectionType] | None = None
+
+    @classmethod
+    def from_links(cls, links: list[VMLink]) -> "CompactLinks":
+        return cls.model_construct(
+            source=[link.source for link in links],
+            target=[link.target for link in links],
+            id=_column_or_none([link.id for link in links], None),
+            connection_type=_column_or_none(
+                [link.connection_type for link in links], "vlan_bridge"
+            ),
+        )
+
+    def rows(self) -> list[dict]:
+        count = len(self.source)
+        ids = self.id or [None] * count
+        types = self.connection_type or ["vlan_bridge"] * count
+        return [
+            {
+                "id": ids[i],
+                "source": self.source[i],
+                "target": self.target[i],
+                "connection_type": types[i],
+            }
+            for i in range(count)
+        ]
+
+
+class CompactCyberRangeRequest(BaseModel):
+    """
+    Same content as CyberRangeRequest, stored as columns instead of one object
+    per node, with UI positions split into an optional `layout` section (node id
+    -> position, default positions left out) and default-valued columns omitted.
+    """
+
+    format: Literal["compact"] = "compact"
+    range_metadata: RangeMetadata
+    nodes: CompactNodes
+    links: CompactLinks
+    layout: dict[str, dict] | None = None
+
+    @classmethod
+    def from_request(
+        cls, request: CyberRangeRequest, include_layout: bool = True
+    ) -> "CompactCyberRangeRequest":
+        layout = {
+            n.id: n.position for n in request.nodes if n.position != DEFAULT_POSITION
+        }
+        return cls.model_construct(
+            format="compact",
+            range_metadata=request.range_metadata,
+            nodes=CompactNodes.from_nodes(request.nodes),
+            links=CompactLinks.from_links(request.links),
+            layout=layout if include_layout and layout else None,
+        )
+
+    def to_request(self) -> CyberRangeRequest:
+        # Validating plain rows in one call is cheaper than model_construct()
+        # per node, which runs in Python
+        return CyberRangeRequest.model_validate(
+            {
+                "range_metadata": self.range_metadata,
+                "nodes": self.nodes.rows(self.layout),
+                "links": self.links.rows(),
+            }
+        )
+
+    def dump(self) -> dict:
+        """JSON-ready dict with omitted columns and layout left out."""
+        return self.model_dump(mode="json", exclude_none=True)
+
+
 class DeploymentResponse(BaseModel):
     range_id: UUID
     status: str
     message: str
+
+
+# --- Range Templates ---
+class RangeTemplateRequest(BaseModel):
+    name: str = Field(pattern=r"^[A-Za-z0-9_.-]+$")
+    description: str | None = None
+    nodes: list[VMNode]
+    links: list[VMLink]
+
+
+class VMNodeOverride(BaseModel):
+    """Per-node changes allowed at instantiation; none of them affect the graph."""
+
+    label: str | None = None
+    template_id: int | None = None
+    resources: VMResource | None = None
+
+
+class TemplateInstantiateRequest(BaseModel):
+    range_name: str
+    version: int | None = None  # latest when omitted
+    created_by: str | None = None
+    node_overrides: dict[str, VMNodeOverride] = {}
+
+
+class TemplateResponse(BaseModel):
+    name: str
+    version: int
+    node_count: int
@@ -0,0 +1,97 @@
+"""
+Compares the full and compact range encodings for large topologies.
+
+Run from backend/:  python -m tests.benchmarks.bench_compact_schema [node counts...]
+
+Reports payload size, request parsing/serialisation time and the cost of a
+save_range/get_range cycle against a state file holding only that range.
+"""
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from uuid import uuid4
+
+from app.core import state_manager
+from app.core.state_manager import StateManager
+from app.models.schemas import CompactCyberRangeRequest, CyberRangeRequest
+
+
+def build_request(count: int) -> CyberRangeRequest:
+    """A jumpbox fanning out to `count - 1` services, every tenth one laid out."""
+    nodes = [{"id": "n0", "label": "Jumpbox", "role": "jumpbox_main", "template_id": 9}]
+    for i in range(1, count):
+        node = {"id": f"n{i}", "label": f"svc-{i}", "role": "service", "template_id": 9}
+        if i % 10 == 0:
+            node["position"] = {"x": i, "y": i // 2}
+        nodes.append(node)
+    return CyberRangeRequest(
+        range_metadata={"id": str(uuid4()), "name": "Benchmark"},
+        nodes=nodes,
+        links=[{"source": "n0", "target": f"n{i}"} for i in range(1, count)],
+    )
+
+
+def ms(fn, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def state_cycle(request: CyberRangeRequest, fmt: str) -> tuple[float, float, int]:
+    state_manager.STATE_FORMAT = fmt
+    save = ms(lambda: StateManager.save_range(request, status="running"))
+    load = ms(lambda: StateManager.get_range(request.range_metadata.id))
+    return save, load, state_manager.STATE_FILE.stat().st_size
+
+
+def bench(count: int) -> None:
+    request = build_request(count)
+    compact = CompactCyberRangeRequest.from_request(request)
+    full_json = request.model_dump_json()
+    compact_json = compact.model_dump_json(exclude_none=True)
+
+    rows = {
+        "payload bytes": (len(full_json), len(compact_json)),
+        "parse ms": (
+            ms(lambda: CyberRangeRequest.model_validate_json(full_json)),
+            ms(lambda: CompactCyberRangeRequest.model_validate_json(compact_json)),
+        ),
+        "parse + to_request ms": (
+            ms(lambda: CyberRangeRequest.model_validate_json(full_json)),
+            ms(
+                lambda: CompactCyberRangeRequest.model_validate_json(
+                    compact_json
+                ).to_request()
+            ),
+        ),
+        "serialise ms": (
+            ms(lambda: request.model_dump_json()),
+            ms(
+                lambda: CompactCyberRangeRequest.from_request(request).model_dump_json(
+                    exclude_none=True
+                )
+            ),
+        ),
+    }
+    full_state = state_cycle(request, "full")
+    compact_state = state_cycle(request, "compact")
+    rows["save_range ms"] = (full_state[0], compact_state[0])
+    rows["get_range ms"] = (full_state[1], compact_state[1])
+    rows["state file bytes"] = (full_state[2], compact_state[2])
+
+    print(f"\n{count} nodes")
+    print(f"  {'':24}{'full':>12}{'compact':>12}{'ratio':>8}")
+    for name, (full, small) in rows.items():
+        print(f"  {name:24}{full:>12.1f}{small:>12.1f}{small / full:>8.2f}")
+
+
+def main(counts: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        state_manager.STATE_FILE = Path(tmp) / "active_ranges.json"
+        state_manager.LOCK_FILE = Path(tmp) / "active_ranges.lock"
+        for count in counts:
+            bench(count)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000])
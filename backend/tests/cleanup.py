@@ -1,26 +1,40 @@
+"""
+Removes lab VMs and bridges that no range in state owns from the real cluster.
+
+Reports what it would delete unless run with --apply. The grace period defaults
+to 0 here since this is meant for wiping a test lab between runs.
+"""
+
+import argparse
+
 from app.adapters.pve_adapter import ProxmoxAdapter
+from app.core.garbage_collector import GarbageCollector
+
 
-def cleanup():
+def cleanup(apply: bool = False, grace_seconds: float = 0):
     adapter = ProxmoxAdapter()
-    
-    # IDs we've been using in our tests
-    vms_to_wipe = [1000, 1001, 1002]
-    # Bridges we've been using (vmbr100, vmbr101, etc.)
-    bridges_to_wipe = ["vmbr100", "vmbr101", "vmbr102"]
-    
-    print("Starting Deep Clean of Lab Environment...")
-
-    # Wipe VMs
-    for vmid in vms_to_wipe:
-        print(f"Checking VM {vmid}...")
-        adapter.delete_vm(vmid)
-        
-    # Wipe Bridges
-    for bridge in bridges_to_wipe:
-        print(f"Checking Bridge {bridge}...")
-        adapter.delete_bridge(bridge)
-        
-    print("Lab environment is now pristine.")
+    print("Scanning lab environment for orphaned VMs and bridges...")
+
+    report = GarbageCollector(adapter, grace_seconds=grace_seconds).collect(
+        dry_run=not apply
+    )
+
+    for key in report.eligible:
+        print(f"{'Deleted' if key in report.deleted else 'Would delete'} {key}")
+    for key, seconds in report.pending.items():
+        print(f"Keeping {key} for another {seconds:.0f}s (grace period)")
+    for key, error in report.errors.items():
+        print(f"Failed to delete {key}: {error['message']}")
+
+    if not apply:
+        print("Dry run only; pass --apply to delete.")
+    elif not report.errors:
+        print("Lab environment is now pristine.")
+
 
 if __name__ == "__main__":
-    cleanup()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apply", action="store_true", help="actually delete")
+    parser.add_argument("--grace", type=float, default=0, help="grace period (s)")
+    args = parser.parse_args()
+    cleanup(apply=args.apply, grace_seconds=args.grace)
@@ -2,7 +2,22 @@ import os
 from uuid import uuid4
 
 import pytest
-from app.core.state_manager import STATE_FILE
+from app.core.event_log import EVENT_LOG_FILE, event_log
+from app.core.garbage_collector import GC_LOCK_FILE, GC_STATE_FILE
+from app.core.lease_manager import LEASE_DB
+from app.core.state_manager import LOCK_FILE, STATE_FILE
+from app.core.template_store import TEMPLATES_FILE, TEMPLATES_LOCK_FILE
+
+RUNTIME_FILES = (
+    STATE_FILE,
+    LOCK_FILE,
+    LEASE_DB,
+    TEMPLATES_FILE,
+    TEMPLATES_LOCK_FILE,
+    EVENT_LOG_FILE,
+    GC_STATE_FILE,
+    GC_LOCK_FILE,
+)
 
 
 @pytest.fixture
@@ -73,10 +88,13 @@ def clean_state_file():
     Runs before and after EVERY test.
     Ensures we start with a clean slate and don't leave junk files.
     """
-    if STATE_FILE.exists():
-        os.remove(STATE_FILE)
+    for path in RUNTIME_FILES:
+        if path.exists():
+            os.remove(path)
 
     yield  # Run the test
 
-    if STATE_FILE.exists():
-        os.remove(STATE_FILE)
+    event_log.flush()  # Let the background writer finish before cleaning up
+    for path in RUNTIME_FILES:
+        if path.exists():
+            os.remove(path)
@@ -0,0 +1,161 @@
+import time
+
+from app.adapters.mock_adapter import MockAdapter
+from app.api.routes import (
+    _dispatch_queued,
+    _queued_leases,
+    get_adapter,
+    resume_orphaned_ranges,
+)
+from app.core.admission import AdmissionController, Demand, admission
+from app.core.lease_manager import range_leases
+from app.core.state_manager import StateManager
+from app.main import app
+from app.models.schemas import CyberRangeRequest, VMNode
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+GIB = 1024**3
+
+
+class SmallCluster(MockAdapter):
+    """One 8 GiB host with 4 cores and nothing running."""
+
+    def __init__(self, used_memory: int = 0):
+        super().__init__()
+        self.status_calls = 0
+        self.used_memory = used_memory
+
+    def get_cluster_status(self):
+        self.status_calls += 1
+        return [
+            {
+                "node": "pve",
+                "status": "online",
+                "cpu": 0.0,
+                "maxcpu": 4,
+                "mem": self.used_memory,
+                "maxmem": 8 * GIB,
+            }
+        ]
+
+
+def vms(count: int, memory: int = 2048) -> Demand:
+    return Demand.of(
+        [
+            VMNode(
+                id=str(i),
+                label="vm",
+                template_id=1,
+                role="service",
+                resources={"cores": 1, "memory": memory},
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def controller(queue_enabled: bool = True) -> AdmissionController:
+    return AdmissionController(
+        status_ttl=60,
+        memory_headroom=0.0,
+        cpu_overcommit=1.0,
+        queue_enabled=queue_enabled,
+    )
+
+
+def test_reservations_queue_and_drain():
+    adapter = SmallCluster()
+    ctl = controller()
+
+    assert ctl.admit("r1", vms(3), adapter).outcome == "admitted"
+    # Only 2 GiB left once r1's reservation is counted
+    assert ctl.admit("r2", vms(2), adapter, payload="r2-job").outcome == "queued"
+    assert ctl.drain(adapter) == []
+    # The cluster view is cached between decisions
+    assert adapter.status_calls == 1
+
+    ctl.release("r1")
+    assert ctl.drain(adapter) == ["r2-job"]
+    assert list(ctl.snapshot()["reserved"]) == ["r2"]
+
+
+def test_rejects_when_queueing_disabled():
+    adapter = SmallCluster()
+    ctl = controller(queue_enabled=False)
+
+    ctl.admit("r1", vms(3), adapter)
+    decision = ctl.admit("r2", vms(2), adapter)
+    assert decision.outcome == "rejected"
+    assert "memory" in decision.reason
+
+
+def test_rejects_requests_larger_than_the_cluster():
+    decision = controller().admit("r1", vms(5), SmallCluster())
+    assert decision.outcome == "rejected"
+
+
+def test_impossible_requests_do_not_block_the_queue():
+    adapter = SmallCluster()
+    ctl = controller()
+
+    # More cores than the cluster has, or a VM bigger than any host
+    assert ctl.admit("r1", Demand(cores=1000), adapter).outcome == "rejected"
+    too_big_vm = Demand(cores=1, memory_mb=6144, largest_memory_mb=6144)
+    ctl.admit("r2", vms(2), adapter)
+    assert ctl.admit("r3", too_big_vm, adapter).outcome == "queued"
+    huge_vm = Demand(cores=1, memory_mb=9000, largest_memory_mb=9000)
+    assert ctl.admit("r4", huge_vm, adapter).outcome == "rejected"
+
+    ctl.release("r2")
+    assert ctl.drain(adapter) == [None]
+
+
+def test_queued_range_is_requeued_after_a_restart(valid_topology_data):
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    # Queued by a worker that has since died, so nobody holds its lease
+    StateManager.save_range(request, status="queued")
+
+    resume_orphaned_ranges()
+
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        if StateManager.get_range(request.range_metadata.id)["status"] == "running":
+            break
+        time.sleep(0.1)
+    assert StateManager.get_range(request.range_metadata.id)["status"] == "running"
+
+
+def test_oversized_range_is_refused_up_front(valid_topology_data):
+    for node in valid_topology_data["nodes"]:
+        node["resources"] = {"cores": 2, "memory": 1024 * 1024}
+
+    response = client.post("/api/v1/range", json=valid_topology_data)
+    assert response.status_code == 503
+    assert response.json()["detail"]["demand"]["memory_mb"] == 3 * 1024 * 1024
+
+
+def test_deleted_queued_range_is_never_dispatched(valid_topology_data):
+    adapter = SmallCluster(used_memory=7 * GIB)
+    app.dependency_overrides[get_adapter] = lambda: adapter
+    admission.invalidate()
+    try:
+        range_id = valid_topology_data["range_metadata"]["id"]
+        response = client.post("/api/v1/range", json=valid_topology_data)
+        assert response.json()["status"] == "queued"
+        assert range_leases.holder(range_id) == range_leases.owner
+
+        assert client.delete(f"/api/v1/range/{range_id}").status_code == 200
+        assert not admission.is_queued(range_id)
+        assert range_id not in _queued_leases
+        assert range_leases.holder(range_id) is None
+
+        # Capacity frees up, but there is nothing left to deploy
+        adapter.used_memory = 0
+        admission.invalidate()
+        _dispatch_queued(adapter)
+        assert adapter.deployed_vms == []
+        assert StateManager.get_range(range_id) is None
+    finally:
+        app.dependency_overrides.clear()
+        admission.invalidate()
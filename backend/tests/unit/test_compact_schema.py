@@ -0,0 +1,92 @@
+import json
+import time
+from uuid import uuid4
+
+import pytest
+from app.core import state_manager
+from app.core.state_manager import StateManager
+from app.main import app
+from app.models.schemas import CompactCyberRangeRequest, CyberRangeRequest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+client = TestClient(app)
+
+
+def large_request(count: int) -> CyberRangeRequest:
+    """A jumpbox fanning out to `count - 1` services, a few with layout set."""
+    nodes = [{"id": "n0", "label": "Jumpbox", "role": "jumpbox_main", "template_id": 9}]
+    nodes += [
+        {"id": f"n{i}", "label": f"Service {i}", "role": "service", "template_id": 9}
+        for i in range(1, count)
+    ]
+    nodes[1]["position"] = {"x": 120, "y": 40}
+    nodes[2]["resources"] = {"cores": 4, "memory": 8192}
+    return CyberRangeRequest(
+        range_metadata={"id": str(uuid4()), "name": "Large"},
+        nodes=nodes,
+        links=[{"source": "n0", "target": f"n{i}"} for i in range(1, count)],
+    )
+
+
+def test_round_trip_preserves_the_request():
+    request = large_request(50)
+    compact = CompactCyberRangeRequest.from_request(request).dump()
+
+    assert "cores" in compact["nodes"] and "vmid" not in compact["nodes"]
+    assert compact["layout"] == {"n1": {"x": 120, "y": 40}}
+    parsed = CompactCyberRangeRequest.model_validate_json(json.dumps(compact))
+    assert parsed.to_request().model_dump() == request.model_dump()
+
+
+def test_columns_must_line_up():
+    compact = CompactCyberRangeRequest.from_request(large_request(3)).dump()
+    compact["nodes"]["label"].pop()
+    with pytest.raises(ValidationError, match="label"):
+        CompactCyberRangeRequest.model_validate(compact)
+
+
+def test_compact_payload_is_smaller_and_cheaper_to_parse():
+    request = large_request(2000)
+    full = request.model_dump_json()
+    compact = CompactCyberRangeRequest.from_request(request).model_dump_json(
+        exclude_none=True
+    )
+    assert len(compact) < len(full) / 3
+
+    def best_of(parse) -> float:
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            parse()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    full_time = best_of(lambda: CyberRangeRequest.model_validate_json(full))
+    compact_time = best_of(lambda: CompactCyberRangeRequest.model_validate_json(compact))
+    assert compact_time < full_time
+
+
+def test_compact_state_reads_back_in_full_shape(monkeypatch):
+    monkeypatch.setattr(state_manager, "STATE_FORMAT", "compact")
+    request = large_request(3)
+    StateManager.save_range(request, status="running")
+    StateManager.update_range(request.range_metadata.id, baseline={"vmids": []})
+
+    raw = json.loads(state_manager.STATE_FILE.read_text())
+    assert raw[str(request.range_metadata.id)]["format"] == "compact"
+
+    state = StateManager.get_range(request.range_metadata.id)
+    assert state["nodes"] == [n.model_dump(mode="json") for n in request.nodes]
+    assert state["baseline"] == {"vmids": []}
+    assert StateManager.to_request(state).model_dump() == request.model_dump()
+
+
+def test_api_accepts_compact_requests(valid_topology_data):
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    body = CompactCyberRangeRequest.from_request(request).dump()
+
+    response = client.post("/api/v1/range", json=body)
+    assert response.status_code == 200
+    state = StateManager.get_range(request.range_metadata.id)
+    assert [n["id"] for n in state["nodes"]] == body["nodes"]["id"]
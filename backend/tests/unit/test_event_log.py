@@ -0,0 +1,86 @@
+import json
+import time
+
+from app.adapters.registry import record_operation
+from app.core.event_log import EventLog, event_log
+from app.main import app
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+
+
+def test_events_are_appended_and_filtered(tmp_path):
+    log = EventLog(tmp_path / "events.jsonl")
+    log.record("deploy_started", "r1", node_count=3)
+    log.record("deploy_completed", "r1", duration_seconds=12.5)
+    log.record("deploy_started", "r2", node_count=1)
+
+    assert [e["event"] for e in log.iter_events(range_id="r1")] == [
+        "deploy_started",
+        "deploy_completed",
+    ]
+    completed = list(log.iter_events(event="deploy_completed"))
+    assert completed[0]["duration_seconds"] == 12.5
+
+
+def test_compaction_drops_expired_events(tmp_path):
+    log = EventLog(tmp_path / "events.jsonl")
+    old = {"ts": time.time() - 10 * 86400, "event": "deploy_started"}
+    log.write_lines([json.dumps(old)])
+    log.record("deploy_started", "r1")
+
+    assert log.compact(retention_days=7) == {"kept": 1, "dropped": 1}
+    assert [e.get("range_id") for e in log.iter_events()] == ["r1"]
+
+
+def test_filtered_reads_skip_malformed_lines(tmp_path):
+    log = EventLog(tmp_path / "events.jsonl")
+    log.record("deploy_started", "r1")
+    # A write cut short by a crash, and a line that is JSON but not an event
+    log.write_lines(['{"ts": 1.0, "event": "deploy_compl', "[1, 2]"])
+    log.record("deploy_completed", "r1")
+
+    assert len(list(log.iter_lines(range_id="r1"))) == 2
+    assert [e["event"] for e in log.iter_events()] == [
+        "deploy_started",
+        "deploy_completed",
+    ]
+
+
+def test_import_then_export_round_trip():
+    lines = [
+        json.dumps({"ts": 1.0, "event": "deploy_started", "range_id": "r1"}),
+        "not json",
+        json.dumps({"event": "missing timestamp"}),
+        json.dumps({"ts": 2.0, "event": "deploy_completed", "range_id": "r1"}),
+    ]
+    response = client.post("/api/v1/events/import", content="\n".join(lines))
+    assert response.json() == {"imported": 2, "rejected": 2}
+
+    exported = client.get("/api/v1/events/export", params={"range_id": "r1"})
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in exported.text.splitlines()]
+    assert [e["event"] for e in events] == ["deploy_started", "deploy_completed"]
+
+
+def test_import_rejects_bad_timestamps_and_encoding():
+    body = b"\n".join(
+        [
+            json.dumps({"ts": "yesterday", "event": "x"}).encode(),
+            json.dumps({"ts": True, "event": "x"}).encode(),
+            b'{"ts": 1.0, "event": "\xff"}',
+            json.dumps({"ts": time.time(), "event": "deploy_started"}).encode(),
+        ]
+    )
+    response = client.post("/api/v1/events/import", content=body)
+    assert response.json() == {"imported": 1, "rejected": 3}
+
+    exported = client.get("/api/v1/events/export", params={"since": 0})
+    assert len(exported.text.splitlines()) == 1
+    assert client.post("/api/v1/events/compact").json() == {"kept": 1, "dropped": 0}
+
+
+def test_adapter_operations_are_logged():
+    record_operation({"operation": "start_vm", "attempts": 2, "error": None})
+    logged = list(event_log.iter_events(event="adapter_operation"))
+    assert logged[-1]["attempts"] == 2
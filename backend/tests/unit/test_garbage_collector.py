@@ -0,0 +1,71 @@
+import pytest
+from app.adapters.mock_adapter import MockAdapter
+from app.core import garbage_collector
+from app.core.garbage_collector import GarbageCollectionError, GarbageCollector
+from app.core.state_manager import STATE_FILE, StateManager
+from app.main import app
+from app.models.schemas import CyberRangeRequest
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def cluster(valid_topology_data):
+    """One range owning VMs 1000-1002 and vmbr100-101, plus leaked resources."""
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    for i, node in enumerate(request.nodes):
+        node.vmid = 1000 + i
+    StateManager.save_range(request, status="running")
+
+    adapter = MockAdapter()
+    adapter.deployed_vms = [100, 1000, 1001, 1002, 1007]  # 100 is below GC_MIN_VMID
+    adapter.foreign_vms = [1500]  # an operator's own VM, never cloned by us
+    adapter.bridges |= {"vmbr100", "vmbr101", "vmbr105", "vmbr-dmz"}
+    return adapter
+
+
+def test_orphans_are_deleted_only_after_grace_period(cluster):
+    clock = FakeClock()
+    gc = GarbageCollector(cluster, grace_seconds=60, clock=clock)
+
+    first = gc.collect()
+    assert set(first.pending) == {"vm:1007", "bridge:vmbr105"}
+    assert first.deleted == []
+
+    # The first sighting is persisted, so the grace period spans runs
+    clock.now += 61
+    second = GarbageCollector(cluster, grace_seconds=60, clock=clock).collect()
+    assert second.deleted == ["vm:1007", "bridge:vmbr105"]
+    assert cluster.deployed_vms == [100, 1000, 1001, 1002]
+    assert cluster.foreign_vms == [1500]
+    assert cluster.bridges == {"vmbr0", "vmbr100", "vmbr101", "vmbr-dmz"}
+
+
+def test_dry_run_changes_nothing(cluster):
+    report = GarbageCollector(cluster, grace_seconds=0).collect(dry_run=True)
+    assert report.eligible == ["bridge:vmbr105", "vm:1007"]
+    assert report.deleted == []
+    assert 1007 in cluster.deployed_vms
+    assert not garbage_collector.GC_STATE_FILE.exists()
+
+
+def test_refuses_to_run_on_unreadable_state(cluster):
+    STATE_FILE.write_text("{not json")
+    with pytest.raises(GarbageCollectionError, match="unreadable"):
+        GarbageCollector(cluster, grace_seconds=0).collect()
+    assert 1000 in cluster.deployed_vms
+
+
+def test_gc_endpoint_defaults_to_dry_run():
+    response = client.post("/api/v1/gc")
+    assert response.status_code == 200
+    assert response.json()["dry_run"] is True
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from app.adapters.governed_adapter import (
+    FairSemaphore,
+    GovernedAdapter,
+    Governor,
+    GovernorLimits,
+    current_range,
+)
+from app.adapters.mock_adapter import MockAdapter
+
+
+def wait_for_queued(sem: FairSemaphore, count: int):
+    deadline = time.monotonic() + 2
+    while sem.snapshot()["queued"] < count:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.005)
+
+
+def test_fair_semaphore_round_robins_across_ranges():
+    sem = FairSemaphore(1)
+    sem.acquire("holder")
+    order: list[str] = []
+
+    def worker(key: str):
+        with sem.slot(key):
+            order.append(key)
+
+    threads = []
+    # Range A queues three requests before range B queues one
+    for i, key in enumerate(["A", "A", "A", "B"]):
+        t = threading.Thread(target=worker, args=(key,))
+        t.start()
+        threads.append(t)
+        wait_for_queued(sem, i + 1)
+
+    assert sem.snapshot()["queued_by_range"] == {"A": 3, "B": 1}
+    sem.release()
+    for t in threads:
+        t.join()
+
+    assert order == ["A", "B", "A", "A"]
+    assert sem.snapshot()["in_use"] == 0
+    assert sem.snapshot()["peak_queued"] == 4
+
+
+class CountingAdapter(MockAdapter):
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def clone_node(self, template_id: int, newid: int, name: str) -> None:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+
+
+def test_clone_concurrency_is_capped():
+    governor = Governor(GovernorLimits(max_clones_per_node=2, max_api_rps=0))
+    inner = CountingAdapter()
+    adapter = GovernedAdapter(inner, governor)
+
+    def deploy(range_id: str, vmid: int):
+        current_range.set(range_id)
+        adapter.clone_node(100, vmid, "vm")
+
+    threads = [
+        threading.Thread(target=deploy, args=(f"range-{i % 3}", 1000 + i))
+        for i in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert inner.peak == 2
+    metrics = governor.metrics()
+    assert metrics["clones_per_node"]["pve-mock-01"]["peak_queued"] > 0
+    assert metrics["clones_per_storage"]["local-lvm"]["in_use"] == 0
@@ -0,0 +1,138 @@
+import sqlite3
+import time
+
+import pytest
+from app.adapters.mock_adapter import MockAdapter
+from app.api.routes import _reconcile, resume_orphaned_ranges
+from app.core.graph_engine import GraphEngine
+from app.core.lease_manager import (
+    Lease,
+    LeaseLostError,
+    LeaseManager,
+    RangeLeaseError,
+    range_leases,
+)
+from app.core.state_manager import StateManager
+from app.main import app
+from app.models.schemas import CyberRangeRequest
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+
+
+def test_only_one_worker_owns_a_range(tmp_path):
+    # Two managers on one database stand in for two worker processes
+    worker_a = LeaseManager(tmp_path / "leases.db", ttl=0.2)
+    worker_b = LeaseManager(tmp_path / "leases.db", ttl=0.2)
+
+    assert worker_a.acquire("r1")
+    assert not worker_b.acquire("r1")
+    assert worker_b.holder("r1") == worker_a.owner
+    assert worker_a.renew("r1")
+
+    # Worker A dies: its lease expires and B takes over
+    time.sleep(0.3)
+    assert worker_b.holder("r1") is None
+    assert worker_b.acquire("r1")
+    assert not worker_a.renew("r1")
+
+
+def test_hold_excludes_threads_of_the_same_worker(tmp_path):
+    worker = LeaseManager(tmp_path / "leases.db", ttl=5)
+
+    with worker.hold("r1"):
+        with pytest.raises(RangeLeaseError):
+            with worker.hold("r1"):
+                pass
+
+    assert worker.holder("r1") is None
+
+
+def test_lease_is_lost_when_renewal_keeps_failing(tmp_path):
+    class LockedDatabase(LeaseManager):
+        def renew(self, range_id):
+            raise sqlite3.OperationalError("database is locked")
+
+    worker_a = LockedDatabase(tmp_path / "leases.db", ttl=0.3)
+    worker_b = LeaseManager(tmp_path / "leases.db", ttl=0.3)
+
+    with worker_a.hold("r1") as lease:
+        time.sleep(0.5)
+        assert lease.lost
+        assert worker_b.acquire("r1")
+
+
+def test_expired_lease_fails_checks_while_renewal_hangs(tmp_path):
+    class HangingDatabase(LeaseManager):
+        def renew(self, range_id):
+            time.sleep(1)  # e.g. blocked on SQLite's busy timeout
+            return False
+
+    worker = HangingDatabase(tmp_path / "leases.db", ttl=0.3)
+    with worker.hold("r1") as lease:
+        lease.check()
+        time.sleep(0.4)
+        assert not lease.lost
+        with pytest.raises(LeaseLostError):
+            lease.check()
+
+
+def test_orphaned_range_is_taken_over(master_id):
+    request = CyberRangeRequest(
+        range_metadata={"id": "11111111-1111-1111-1111-111111111111", "name": "R"},
+        nodes=[
+            {"id": master_id, "label": "JB", "role": "jumpbox_main", "template_id": 1}
+        ],
+        links=[],
+    )
+    # A worker saved this and died before finishing
+    StateManager.save_range(request, status="provisioning")
+
+    resume_orphaned_ranges()
+
+    # The deployment runs on its own thread, not the maintenance scan's
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        state = StateManager.get_range(request.range_metadata.id)
+        if state["status"] == "running" and not range_leases.holder(request.range_metadata.id):
+            break
+        time.sleep(0.1)
+    assert state["status"] == "running"
+    assert state["nodes"][0]["vmid"] is not None
+    assert range_leases.holder(request.range_metadata.id) is None
+
+
+def test_lost_lease_stops_reconciliation_without_writing(valid_topology_data):
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    lease = Lease(range_leases, str(request.range_metadata.id), time.time())
+
+    class TakenOverMidClone(MockAdapter):
+        def clone_node(self, template_id, newid, name):
+            self.deployed_vms.append(newid)
+            lease.lost = True
+
+    adapter = TakenOverMidClone()
+    with pytest.raises(LeaseLostError):
+        _reconcile(request, GraphEngine(request), adapter, lease)
+
+    assert len(adapter.deployed_vms) == 1
+    state = StateManager.get_range(request.range_metadata.id)
+    assert state["status"] == "provisioning"
+    assert all(n["vmid"] is None for n in state["nodes"])
+
+
+def test_range_being_reconciled_elsewhere_cannot_be_deleted(valid_topology_data):
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    StateManager.save_range(request, status="provisioning")
+    other_worker = LeaseManager(range_leases.db_path, ttl=5)
+    assert other_worker.acquire(request.range_metadata.id)
+
+    response = client.delete(f"/api/v1/range/{request.range_metadata.id}")
+    assert response.status_code == 409
+    assert StateManager.get_range(request.range_metadata.id) is not None
+
+    other_worker.release(request.range_metadata.id)
+    response = client.delete(f"/api/v1/range/{request.range_metadata.id}")
+    assert response.status_code == 200
+    assert StateManager.get_range(request.range_metadata.id) is None
+    assert range_leases.holder(request.range_metadata.id) is None
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from app.adapters.errors import TransientAdapterError
+from app.adapters.pve_adapter import ProxmoxAdapter
+from proxmoxer.core import ResourceException
+
+
+@pytest.fixture
+def pve_env(monkeypatch):
+    monkeypatch.setenv("PVE_HOST", "pve.example.test")
+    monkeypatch.setenv("PVE_USER", "root@pam")
+    monkeypatch.setenv("PVE_TOKEN_NAME", "test")
+    monkeypatch.setenv("PVE_TOKEN_VALUE", "secret")
+    monkeypatch.setenv("PVE_POOL_MAXSIZE", "16")
+
+
+def test_session_uses_sized_blocking_pool(pve_env):
+    adapter = ProxmoxAdapter()
+    pool = adapter.api._store["session"].get_adapter("https://pve.example.test")
+
+    assert pool._pool_maxsize == 16
+    assert pool._pool_block is True
+    assert adapter.api._backend.auth.timeout == 30
+
+
+def test_start_vm_leaves_running_vms_alone(pve_env, monkeypatch):
+    adapter = ProxmoxAdapter()
+    api = MagicMock()
+    monkeypatch.setattr(adapter, "_get_node", lambda: "pve1")
+    monkeypatch.setattr(adapter, "_node_api", lambda node: api)
+
+    api.qemu.return_value.status.current.get.return_value = {"status": "running"}
+    adapter.start_vm(101)
+    api.qemu.return_value.status.start.post.assert_not_called()
+
+    # Lost the race with another start: the failed task still means "running"
+    api.qemu.return_value.status.current.get.return_value = {"status": "stopped"}
+    api.qemu.return_value.status.start.post.return_value = "UPID:pve1:1"
+    api.tasks.return_value.status.get.return_value = {
+        "status": "stopped",
+        "exitstatus": "VM 101 already running",
+    }
+    adapter.start_vm(101)
+
+
+def test_agent_ping_reports_connection_failures_as_typed_errors(pve_env, monkeypatch):
+    adapter = ProxmoxAdapter()
+    api = MagicMock()
+    monkeypatch.setattr(adapter, "_get_node", lambda: "pve1")
+    monkeypatch.setattr(adapter, "_node_api", lambda node: api)
+    ping = api.qemu.return_value.agent.ping.post
+
+    ping.side_effect = ResourceException(500, "Internal Server Error", "QEMU guest agent is not running")
+    assert adapter.agent_ping(101) is False
+
+    ping.side_effect = requests.ConnectionError("connection refused")
+    with pytest.raises(TransientAdapterError):
+        adapter.agent_ping(101)
+
+
+def test_clones_are_tagged_and_listed_as_managed(pve_env, monkeypatch):
+    adapter = ProxmoxAdapter()
+    api = MagicMock()
+    monkeypatch.setattr(adapter, "_get_node", lambda: "pve1")
+    monkeypatch.setattr(adapter, "_node_api", lambda node: api)
+    monkeypatch.setattr(adapter, "_wait_for_task", lambda upid: True)
+
+    config = api.qemu.return_value.config
+    api.qemu.return_value.clone.post.return_value = "UPID:pve1:2"
+    config.get.return_value = {}
+    adapter.clone_node(9000, 1001, "web")
+    config.put.assert_called_once_with(tags="cyber-range")
+
+    # Tags inherited from the template are kept
+    config.put.reset_mock()
+    config.get.return_value = {"tags": "lab;windows"}
+    adapter.clone_node(9000, 1002, "dc")
+    config.put.assert_called_once_with(tags="lab;windows;cyber-range")
+
+    api.qemu.get.return_value = [
+        {"vmid": "1001", "tags": "lab;cyber-range"},
+        {"vmid": 1500, "tags": "cyber-range-old"},
+        {"vmid": 1501},
+        {"vmid": 1502, "tags": "lab,cyber-range"},
+    ]
+    assert [vm["managed"] for vm in adapter.list_vms()] == [True, False, False, True]
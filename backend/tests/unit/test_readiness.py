@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+from app.adapters.errors import TransientAdapterError
+from app.adapters.mock_adapter import MockAdapter
+from app.core.parallel import MAX_PARALLELISM
+from app.core.readiness import ReadinessChecker, ReadinessPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class SlowBoot(MockAdapter):
+    """VMs report running `boot` seconds of fake time after first being polled."""
+
+    def __init__(self, clock: FakeClock, boot: float, agent: bool = True):
+        super().__init__()
+        self.clock = clock
+        self.boot = boot
+        self.agent = agent
+        self.first_seen: dict[int, float] = {}
+
+    def get_vm_status(self, vmid: int) -> dict:
+        first = self.first_seen.setdefault(vmid, self.clock.now)
+        up = self.clock.now - first >= self.boot
+        return {"vmid": vmid, "status": "running" if up else "stopped"}
+
+    def agent_ping(self, vmid: int) -> bool:
+        return self.agent
+
+
+def checker(adapter, clock, **policy) -> ReadinessChecker:
+    return ReadinessChecker(
+        adapter,
+        ReadinessPolicy(timeout=10, max_poll=1, **policy),
+        sleep=clock.sleep,
+        clock=clock,
+    )
+
+
+def test_waits_for_running_and_agent():
+    clock = FakeClock()
+    ready = checker(SlowBoot(clock, boot=3), clock, require_agent=True)
+    assert 3 <= ready.wait_ready(101) < 4
+
+
+def test_times_out_when_agent_never_answers():
+    clock = FakeClock()
+    ready = checker(SlowBoot(clock, boot=0, agent=False), clock, require_agent=True)
+    with pytest.raises(TransientAdapterError, match="agent"):
+        ready.wait_ready(101)
+    assert clock.now == 10
+
+
+def test_time_to_ready_counts_from_start_command():
+    adapter = MockAdapter()
+    for vmid in (101, 102):
+        adapter.start_vm(vmid)
+    ready = ReadinessChecker(adapter, ReadinessPolicy(timeout=1, first_poll=0.05))
+
+    report = ready.wait_all([101, 102, 103])
+    assert set(report.ready) == {101, 102}
+    # 103 was never started
+    assert list(report.errors) == [103]
+    assert report.to_dict()["not_ready"]["103"]["operation"] == "wait_ready"
+
+
+def test_large_ranges_share_a_bounded_pool():
+    threads: set[str] = set()
+
+    class Recording(MockAdapter):
+        def get_vm_status(self, vmid: int) -> dict:
+            threads.add(threading.current_thread().name)
+            return {"vmid": vmid, "status": "running"}
+
+    report = ReadinessChecker(Recording()).wait_all(range(200))
+    assert len(report.ready) == 200
+    assert len(threads) <= MAX_PARALLELISM
@@ -0,0 +1,84 @@
+import pytest
+from app.adapters.errors import (
+    CircuitOpenError,
+    PermanentAdapterError,
+    TransientAdapterError,
+)
+from app.adapters.mock_adapter import MockAdapter
+from app.adapters.resilient_adapter import ResilientAdapter, RetryPolicy
+
+
+class FlakyAdapter(MockAdapter):
+    """Fails the first `failures` clones/starts with the given error type."""
+
+    def __init__(self, failures: int, error: type = TransientAdapterError):
+        super().__init__()
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        self.deleted: list[int] = []
+
+    def clone_node(self, template_id: int, newid: int, name: str) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("simulated failure")
+        self.deployed_vms.append(newid)
+
+    def start_vm(self, vmid: int):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("simulated failure")
+
+    def delete_vm(self, vmid: int):
+        self.deleted.append(vmid)
+        super().delete_vm(vmid)
+
+
+def make_adapter(inner, attempts=4, threshold=10):
+    return ResilientAdapter(
+        inner,
+        policy=RetryPolicy(max_attempts=attempts, base_delay=0, max_delay=0),
+        failure_threshold=threshold,
+        reset_timeout=60,
+        sleep=lambda _: None,
+    )
+
+
+def test_transient_failure_is_retried():
+    inner = FlakyAdapter(failures=2)
+    make_adapter(inner).clone_node(100, 1000, "vm")
+
+    assert inner.calls == 3
+    assert inner.deployed_vms == [1000]
+    # The half-built clone is removed before each retry
+    assert inner.deleted == [1000, 1000]
+
+
+def test_permanent_failure_is_not_retried():
+    inner = FlakyAdapter(failures=1, error=PermanentAdapterError)
+    with pytest.raises(PermanentAdapterError) as exc:
+        make_adapter(inner).clone_node(100, 1000, "vm")
+
+    assert inner.calls == 1
+    assert exc.value.operation == "clone_node"
+    assert exc.value.node == "pve-mock-01"
+
+
+def test_retries_exhausted_raises_typed_error():
+    inner = FlakyAdapter(failures=10)
+    with pytest.raises(TransientAdapterError):
+        make_adapter(inner, attempts=3).start_vm(1000)
+    assert inner.calls == 3
+
+
+def test_circuit_opens_after_repeated_failures():
+    inner = FlakyAdapter(failures=10)
+    adapter = make_adapter(inner, attempts=1, threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(TransientAdapterError):
+            adapter.start_vm(1000)
+
+    with pytest.raises(CircuitOpenError):
+        adapter.start_vm(1000)
+    assert inner.calls == 2
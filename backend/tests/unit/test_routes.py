@@ -1,7 +1,16 @@
+import copy
 import time
+from uuid import uuid4
 
+import pytest
+from app.adapters.errors import PermanentAdapterError, TransientAdapterError
+from app.adapters.mock_adapter import MockAdapter
+from app.api import routes
+from app.api.routes import get_adapter, run_deployment
+from app.core.graph_engine import GraphEngine
 from app.core.state_manager import StateManager
 from app.main import app
+from app.models.schemas import CyberRangeRequest
 from fastapi.testclient import TestClient
 
 client = TestClient(app)
@@ -22,9 +31,170 @@ def test_create_cyber_range_success(valid_topology_data):
     assert saved_state is not None
     assert saved_state["status"] == "running"
     assert saved_state["nodes"][0]["vmid"] is not None
+    vmids = {str(n["vmid"]) for n in saved_state["nodes"]}
+    assert set(saved_state["readiness"]["ready"]) == vmids
 
 
 def test_invalid_topology_rejection(cyclic_topology_data):
     response = client.post("/api/v1/range", json=cyclic_topology_data)
     assert response.status_code == 400
     assert "Invalid topology" in response.json()["detail"]
+
+
+def test_reset_range_rolls_back_to_baseline(valid_topology_data):
+    range_id = valid_topology_data["range_metadata"]["id"]
+    client.post("/api/v1/range", json=valid_topology_data)
+
+    saved_state = StateManager.get_range(range_id)
+    vmids = sorted(n["vmid"] for n in saved_state["nodes"])
+    assert saved_state["baseline"]["vmids"] == vmids
+
+    response = client.post(f"/api/v1/range/{range_id}/reset")
+    assert response.status_code == 200
+
+    reset_state = StateManager.get_range(range_id)
+    assert reset_state["status"] == "running"
+    assert reset_state["last_reset"]["duration_seconds"] < 5
+
+
+def test_snapshot_failure_does_not_fail_the_deployment(valid_topology_data):
+    class NoSnapshots(FailingClone):
+        def snapshot_vm(self, vmid, snapname):
+            raise PermanentAdapterError("snapshot feature is not available")
+
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    run_deployment(request, GraphEngine(request), NoSnapshots(None))
+
+    state = StateManager.get_range(request.range_metadata.id)
+    assert state["status"] == "running"
+    assert "snapshot" in state["baseline_error"]["message"]
+    response = client.post(f"/api/v1/range/{request.range_metadata.id}/reset")
+    assert response.status_code == 409
+
+
+def test_reset_unknown_range():
+    response = client.post(
+        "/api/v1/range/99999999-9999-9999-9999-999999999999/reset"
+    )
+    assert response.status_code == 404
+
+
+class FailingClone(MockAdapter):
+    """The first clone fails with `error`; the rest succeed without delay."""
+
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+    def clone_node(self, template_id, newid, name):
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+        self.deployed_vms.append(newid)
+
+
+@pytest.mark.parametrize(
+    "error, unconfirmed",
+    [
+        (PermanentAdapterError("VM 1000 already exists"), False),
+        (TransientAdapterError("clone timed out"), True),
+    ],
+)
+def test_failed_clone_is_never_claimed(valid_topology_data, error, unconfirmed):
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    range_id = request.range_metadata.id
+    adapter = FailingClone(error)
+
+    run_deployment(request, GraphEngine(request), adapter)
+    state = StateManager.get_range(range_id)
+    assert state["status"] == "failed"
+    assert all(n["vmid"] is None for n in state["nodes"])
+    assert state.get("unconfirmed_vmids", []) == ([1000] if unconfirmed else [])
+
+    if not unconfirmed:
+        return
+
+    # The next attempt clears up the possibly half-built clone first
+    deleted = []
+    adapter.delete_vm = deleted.append
+    retry = CyberRangeRequest.model_validate(valid_topology_data)
+    run_deployment(retry, GraphEngine(retry), adapter)
+    state = StateManager.get_range(range_id)
+    assert state["status"] == "running"
+    assert state["unconfirmed_vmids"] == []
+    assert deleted == [1000]
+
+
+def test_unconfirmed_vmid_reused_by_another_range_is_kept(valid_topology_data):
+    range_a = CyberRangeRequest.model_validate(valid_topology_data)
+    adapter = FailingClone(TransientAdapterError("clone timed out"))
+    run_deployment(range_a, GraphEngine(range_a), adapter)
+    assert StateManager.get_range(range_a.range_metadata.id)["unconfirmed_vmids"] == [1000]
+
+    # Another range deploys onto 1000 before range A is retried
+    data_b = copy.deepcopy(valid_topology_data)
+    data_b["range_metadata"]["id"] = str(uuid4())
+    range_b = CyberRangeRequest.model_validate(data_b)
+    run_deployment(range_b, GraphEngine(range_b), adapter)
+    b_vmids = {n["vmid"] for n in StateManager.get_range(range_b.range_metadata.id)["nodes"]}
+    assert 1000 in b_vmids
+
+    deleted = []
+    adapter.delete_vm = deleted.append
+    retry = CyberRangeRequest.model_validate(valid_topology_data)
+    run_deployment(retry, GraphEngine(retry), adapter)
+    state = StateManager.get_range(range_a.range_metadata.id)
+    assert state["status"] == "running"
+    assert deleted == []
+    assert not b_vmids & {n["vmid"] for n in state["nodes"]}
+
+    # Deleting range A leaves range B's VMs alone as well
+    StateManager.update_range(range_a.range_metadata.id, unconfirmed_vmids=[1000])
+    app.dependency_overrides[get_adapter] = lambda: adapter
+    try:
+        response = client.delete(f"/api/v1/range/{range_a.range_metadata.id}")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert deleted and not b_vmids & set(deleted)
+
+
+def test_provisioning_checkpoints_are_throttled(valid_topology_data, monkeypatch):
+    monkeypatch.setattr(routes, "CHECKPOINT_INTERVAL", 3600)
+    saved = []
+    save_range = StateManager.save_range
+
+    def recording_save(request, status="provisioning", **kwargs):
+        saved.append(status)
+        return save_range(request, status, **kwargs)
+
+    monkeypatch.setattr(StateManager, "save_range", staticmethod(recording_save))
+
+    request = CyberRangeRequest.model_validate(valid_topology_data)
+    run_deployment(request, GraphEngine(request), FailingClone(None))
+
+    # One save when starting, then only the booting and running transitions
+    assert saved == ["provisioning", "booting", "running"]
+    state = StateManager.get_range(request.range_metadata.id)
+    assert all(n["vmid"] is not None for n in state["nodes"])
+
+
+def test_deleting_a_range_keeps_bridges_other_ranges_use(valid_topology_data):
+    adapter = FailingClone(None)
+    ranges = []
+    for _ in range(2):
+        data = copy.deepcopy(valid_topology_data)
+        data["range_metadata"]["id"] = str(uuid4())
+        request = CyberRangeRequest.model_validate(data)
+        run_deployment(request, GraphEngine(request), adapter)
+        ranges.append(request)
+    shared = set(GraphEngine(ranges[1]).get_required_bridges())
+    assert shared and shared <= adapter.bridges
+
+    app.dependency_overrides[get_adapter] = lambda: adapter
+    try:
+        response = client.delete(f"/api/v1/range/{ranges[0].range_metadata.id}")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert shared <= adapter.bridges
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from app.adapters.mock_adapter import MockAdapter
+from app.adapters.registry import AdapterProvider, create_adapter
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Generous enough for a cold CI box; a regression to import-time adapter
+# construction against an unreachable host blows well past it.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "3.0"))
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+print(",".join(m for m in ("proxmoxer", "urllib3") if m in sys.modules))
+"""
+
+# Loads the given .env file wherever app.main calls load_dotenv()
+DOTENV_PROBE = """
+import sys
+import dotenv
+load = dotenv.load_dotenv
+dotenv.load_dotenv = lambda *args, **kwargs: load(sys.argv[1])
+import app.main
+from app.adapters.registry import adapter_provider
+from app.core import state_manager
+from app.core.admission import admission
+from app.core.lease_manager import range_leases
+print(adapter_provider.governor.limits.max_clones_per_node, range_leases.ttl,
+      admission.queue_enabled, state_manager.STATE_FORMAT)
+"""
+
+
+def test_api_import_is_fast_and_lazy():
+    env = {**os.environ, "APP_MODE": "PROD", "PVE_HOST": "unreachable.invalid"}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, loaded = result.stdout.splitlines()[-2:]
+    assert float(elapsed) < STARTUP_BUDGET_SECONDS
+    # Even in PROD mode nothing backend-specific is imported until first use
+    assert loaded == ""
+
+
+def test_dotenv_settings_apply_to_import_time_config(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "GOV_MAX_CLONES_PER_NODE=7\nLEASE_TTL=5\n"
+        "ADMISSION_QUEUE=false\nSTATE_FORMAT=compact\n"
+    )
+    settings = ("GOV_MAX_CLONES_PER_NODE", "LEASE_TTL", "ADMISSION_QUEUE", "STATE_FORMAT")
+    env = {k: v for k, v in os.environ.items() if k not in settings}
+    result = subprocess.run(
+        [sys.executable, "-c", DOTENV_PROBE, str(env_file)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "7 5.0 False compact"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_adapter("vmware")
+
+
+def test_provider_builds_adapter_once(monkeypatch):
+    monkeypatch.setenv("ADAPTER_BACKEND", "mock")
+    provider = AdapterProvider()
+
+    adapter = provider.get()
+    assert adapter is provider.get()
+    assert isinstance(adapter.inner.inner, MockAdapter)
+
+    provider.close()
+    assert provider.get() is not adapter
@@ -0,0 +1,81 @@
+from app.core.graph_engine import GraphEngine
+from app.core.state_manager import StateManager
+from app.main import app
+from app.models.schemas import CyberRangeRequest
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+
+
+def test_plan_round_trip_matches_graph(valid_topology_data, master_id):
+    request = CyberRangeRequest(**valid_topology_data)
+    engine = GraphEngine(request)
+    planned = GraphEngine.from_plan(request, engine.to_plan())
+
+    assert planned.validate_topology()
+    assert planned.get_required_bridges() == engine.get_required_bridges()
+    assert planned.get_reachable_nodes() == engine.get_reachable_nodes()
+    for node_id in (master_id, "n2", "n3"):
+        assert planned.get_node_interfaces(node_id) == engine.get_node_interfaces(
+            node_id
+        )
+    # Plans are built once; the planned engine never builds a graph
+    assert planned.graph.number_of_nodes() == 0
+
+
+def test_templates_are_versioned(valid_topology_data):
+    body = {
+        "name": "web-lab",
+        "nodes": valid_topology_data["nodes"],
+        "links": valid_topology_data["links"],
+    }
+    assert client.post("/api/v1/templates", json=body).json()["version"] == 1
+    assert client.post("/api/v1/templates", json=body).json()["version"] == 2
+
+    listing = client.get("/api/v1/templates").json()
+    assert listing == [
+        {"name": "web-lab", "latest_version": 2, "description": None, "node_count": 3}
+    ]
+
+
+def test_invalid_template_is_rejected(cyclic_topology_data):
+    body = {
+        "name": "loop",
+        "nodes": cyclic_topology_data["nodes"],
+        "links": cyclic_topology_data["links"],
+    }
+    assert client.post("/api/v1/templates", json=body).status_code == 400
+
+
+def test_instantiate_template(master_id):
+    client.post(
+        "/api/v1/templates",
+        json={
+            "name": "solo",
+            "nodes": [
+                {"id": master_id, "label": "JB", "role": "jumpbox_main", "template_id": 1}
+            ],
+            "links": [],
+        },
+    )
+
+    response = client.post(
+        "/api/v1/templates/solo/instantiate",
+        json={
+            "range_name": "Team A",
+            "node_overrides": {master_id: {"template_id": 42}},
+        },
+    )
+    assert response.status_code == 200
+
+    state = StateManager.get_range(response.json()["range_id"])
+    assert state["metadata"]["name"] == "Team A"
+    assert state["status"] == "running"
+    assert state["nodes"][0]["template_id"] == 42
+
+
+def test_instantiate_unknown_template():
+    response = client.post(
+        "/api/v1/templates/missing/instantiate", json={"range_name": "X"}
+    )
+    assert response.status_code == 404